@@ -0,0 +1,148 @@
+"""Memory footprint of the Homie topic tree (TopicDict) for a synthetic fleet.
+
+usage: python benchmarks/bench_memory.py [--devices 1000] [--nodes 2] [--properties 5]
+                                         [--snapshot devices.jsonl]"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import importlib.util
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fleet import fleet_messages
+
+TOPIC_DICT_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, "homie", "homie", "topic_dict.py"
+)
+
+
+def load_topic_dict():
+    """Load topic_dict module stand-alone (ie. without Home Assistant)."""
+    spec = importlib.util.spec_from_file_location("topic_dict", TOPIC_DICT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_trees(topic_dict, messages, base_topic: str) -> dict:
+    """Fill the trees as HomieDevice, HomieNode and HomieProperty do."""
+    TopicDict = topic_dict.TopicDict
+    devices = dict()
+    nodes = dict()
+    properties = dict()
+
+    for topic, payload in messages:
+        device_id, *levels = topic[len(base_topic) + 1 :].split("/")
+
+        if (device := devices.get(device_id)) is None:
+            device = devices[device_id] = TopicDict(include_topics=["^\\$"])
+            device.add_index("$datatype", "$settable", "$unit")
+
+        if levels[0].startswith("$"):
+            device.set("/".join(levels), payload)
+            continue
+
+        node_key = (device_id, levels[0])
+
+        if (node := nodes.get(node_key)) is None:
+            node = nodes[node_key] = TopicDict(include_topics=["^\\$"])
+            device.set(levels[0], node, force=True)
+
+        if len(levels) == 1 or levels[1].startswith("$"):
+            node.set("/".join(levels[1:]), payload)
+            continue
+
+        property_key = (*node_key, levels[1])
+
+        if (property := properties.get(property_key)) is None:
+            property = properties[property_key] = TopicDict()
+            node.set(levels[1], property, force=True)
+
+        if len(levels) == 2:
+            property.value = payload
+        else:
+            property.set("/".join(levels[2:]), payload)
+
+    return devices, nodes, properties
+
+
+def bench_snapshot(topic_dict, devices: dict, path: str) -> dict:
+    """Dump the devices trees as JSON lines (as the integration cache does) and
+    bulk load them back in new trees."""
+    start = time.perf_counter()
+
+    with open(path, "w", encoding="utf-8") as fp:
+        for device_id, device in devices.items():
+            topic_dict.dump_jsonl([{"id": device_id}], fp)
+            topic_dict.dump_jsonl(device.dump(), fp)
+
+    dumped = time.perf_counter() - start
+    loaded = dict()
+    start = time.perf_counter()
+
+    with open(path, encoding="utf-8") as fp:
+        for record in topic_dict.load_jsonl(fp):
+            if isinstance(record, dict):
+                device = loaded[record["id"]] = topic_dict.TopicDict()
+                device.add_index("$datatype", "$settable", "$unit")
+            else:
+                device.load((record,))
+
+    return {
+        "size": os.path.getsize(path),
+        "dump": dumped,
+        "load": time.perf_counter() - start,
+        "devices": len(loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--nodes", type=int, default=2)
+    parser.add_argument("--properties", type=int, default=5)
+    parser.add_argument("--homie-version", default="3.0.1")
+    parser.add_argument("--snapshot", help="JSON lines file to dump and load")
+    args = parser.parse_args()
+
+    topic_dict = load_topic_dict()
+    messages = list(
+        fleet_messages(
+            args.devices, args.nodes, args.properties, homie_version=args.homie_version
+        )
+    )
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    trees = build_trees(topic_dict, messages, "homie")
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Don't account the bench containers (ie. the dicts of trees)
+    containers = sum(sys.getsizeof(tree) for tree in trees)
+    used = after - before - containers
+    devices, nodes, properties = trees
+
+    print(f"messages:            {len(messages)}")
+    print(f"devices/nodes/props: {len(devices)}/{len(nodes)}/{len(properties)}")
+    print(
+        f"tree memory:         {used / 1024 / 1024:.2f} MiB (peak {peak / 1024 / 1024:.2f} MiB)"
+    )
+    print(f"bytes per message:   {used / len(messages):.0f}")
+    print(f"bytes per property:  {used / len(properties):.0f}")
+
+    if args.snapshot:
+        snapshot = bench_snapshot(topic_dict, devices, args.snapshot)
+        print(
+            f"snapshot:            {snapshot['size'] / 1024 / 1024:.2f} MiB"
+            f", dump {snapshot['dump']:.3f} s, load {snapshot['load']:.3f} s"
+            f" ({snapshot['devices']} devices)"
+        )
+
+
+if __name__ == "__main__":
+    main()
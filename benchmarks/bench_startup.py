@@ -0,0 +1,269 @@
+"""Startup of a synthetic Homie fleet replayed as retained messages by a fake broker.
+
+Discovery, HomieDevice/HomieNode/HomieProperty and the entities subscriptions run
+as in the integration (see _async_setup_discovery), without Home Assistant.
+
+With --restore the devices trees are restored (as from the integration cache) and
+their entities added before the broker replay, so the replay state writes count.
+
+usage: python benchmarks/bench_startup.py [--devices 100] [--nodes 2] [--properties 5]
+                                          [--single-subscription] [--shuffle] [--restore]"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fleet import fleet_messages
+from fake_mqtt import FakeBroker, FakeHass, load_homie_core
+
+# Same of the integration (see const.py and __init__.py)
+HOMIE_SUPPORTED_VERSION = ["3.0", "3.0.0", "3.0.1", "4.0", "4.0.0"]
+DISCOVERY_TOPIC = "{}/+/$homie"
+SINGLE_SUBSCRIPTION_TOPIC = "{}/#"
+DISCOVER_DEVICE = re.compile(
+    r"(?P<prefix_topic>\w[-/\w]*\w)/(?P<device_id>\w[-\w]*\w)/\$homie"
+)
+
+
+def entity_probe_cls(homie_core):
+    """Return the HomieEntity stand-in: same subscriptions and coalescing (ie.
+    HomiePropertyObserver), the state writes are only counted."""
+
+    class EntityProbe(homie_core.HomiePropertyObserver):
+        def __init__(self, homie_property, state_write_window: float):
+            self._homie_property = homie_property
+            self._homie_device = homie_property.node.device
+            self._state_write_window = state_write_window
+            self.state_writes = 0
+
+            self._async_subscribe_homie()
+
+        def async_write_ha_state(self):
+            self.state_writes += 1
+
+    return EntityProbe
+
+
+def snapshot_records(messages, base_topic: str) -> dict[str, list]:
+    """Return the snapshot records (see HomieBase.snapshot()) by device id."""
+    records = dict()
+
+    for topic, payload in messages:
+        device_id, topic = topic[len(base_topic) + 1 :].split("/", 1)
+
+        if "$" in topic and topic.split("/", 1)[0] not in ("$state", "$stats"):
+            records.setdefault(device_id, []).append((topic, payload))
+
+    return records
+
+
+async def async_bench(args) -> dict:
+    broker = FakeBroker(args.subscribe_latency)
+    homie_core = load_homie_core(broker)
+    EntityProbe = entity_probe_cls(homie_core)
+    hass = FakeHass()
+    loop = asyncio.get_running_loop()
+
+    messages = list(
+        fleet_messages(
+            args.devices,
+            args.nodes,
+            args.properties,
+            base_topic=args.base_topic,
+            homie_version=args.homie_version,
+            shuffle=args.shuffle,
+        )
+    )
+
+    # Replayed on subscribe, or after the restore (ie. as on a reconnect)
+    if not args.restore:
+        for topic, payload in messages:
+            broker.publish(topic, payload, retain=True)
+
+    tasks_created = 0
+
+    def task_factory(loop, coro, **kwargs):
+        nonlocal tasks_created
+        tasks_created += 1
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    devices = dict()
+    entities = list()
+    all_ready = asyncio.Event()
+    router = homie_core.HomieRouter() if args.single_subscription else None
+    setup_semaphore = asyncio.Semaphore(args.setup_concurrency)
+    ingest_queue = (
+        homie_core.HomieIngestQueue(args.ingest_queue_size)
+        if args.ingest_queue_size
+        else None
+    )
+
+    async def async_discovery_message_received(mqttmsg):
+        device_match = DISCOVER_DEVICE.match(mqttmsg.topic)
+
+        if device_match and mqttmsg.payload in HOMIE_SUPPORTED_VERSION:
+            device_id = device_match.group("device_id")
+
+            if device_id not in devices:
+                await async_add_device(
+                    f"{device_match.group('prefix_topic')}/{device_id}"
+                )
+
+    async def async_add_device(base_topic: str, records: list | None = None):
+        device = homie_core.HomieDevice(
+            hass,
+            base_topic,
+            0,
+            async_device_on_ready,
+            router=router,
+            ready_timeout=args.ready_timeout,
+            setup_semaphore=setup_semaphore,
+            ingest_queue=ingest_queue,
+        )
+        devices[device.id] = device
+
+        if records:
+            device.restore(records)
+
+        await device.async_setup()
+        return device
+
+    ready_devices = 0
+    probed_devices = set()
+
+    def add_entities(homie_device):
+        if homie_device.id not in probed_devices:
+            probed_devices.add(homie_device.id)
+            entities.extend(
+                EntityProbe(homie_property, args.state_write_window)
+                for homie_property in homie_device.query_properties()
+            )
+
+    async def async_device_on_ready(homie_device):
+        nonlocal ready_devices
+
+        add_entities(homie_device)
+        ready_devices += 1
+
+        if ready_devices == args.devices:
+            all_ready.set()
+
+    def async_message_received(mqttmsg):
+        router.route(mqttmsg)
+
+        if homie_core.utils.topic_match(
+            discovery_topic_levels, mqttmsg.topic.split("/")
+        ):
+            hass.async_create_task(async_discovery_message_received(mqttmsg))
+
+    discovery_topic = DISCOVERY_TOPIC.format(args.base_topic)
+    discovery_topic_levels = discovery_topic.split("/")
+
+    tracemalloc.start()
+    loop.set_task_factory(task_factory)
+    start = time.perf_counter()
+
+    if router is None:
+        await broker.async_subscribe(
+            hass, discovery_topic, async_discovery_message_received
+        )
+    else:
+        await broker.async_subscribe(
+            hass,
+            SINGLE_SUBSCRIPTION_TOPIC.format(args.base_topic),
+            async_message_received,
+        )
+
+    # Entities added on the restored trees (as the integration cache does)
+    if args.restore:
+
+        async def async_restore_device(device_id: str, records: list):
+            device = await async_add_device(f"{args.base_topic}/{device_id}", records)
+            await device.async_nodes_ready()
+            add_entities(device)
+
+        await asyncio.gather(
+            *(
+                async_restore_device(device_id, records)
+                for device_id, records in snapshot_records(
+                    messages, args.base_topic
+                ).items()
+            )
+        )
+
+        # Retained on the broker and replayed as after a reconnect
+        for topic, payload in messages:
+            broker.retain(topic, payload)
+
+        broker.replay_retained()
+
+    try:
+        await asyncio.wait_for(all_ready.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        pass
+
+    elapsed = time.perf_counter() - start
+    loop.set_task_factory(None)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    setup_durations = [device.setup_duration or 0 for device in devices.values()] or [0]
+
+    stats = {
+        "messages": len(broker.retained),
+        "delivered": broker.delivered,
+        "subscriptions": broker.subscriptions_count,
+        "devices": f"{ready_devices}/{args.devices} ready",
+        "entities": len(entities),
+        "time to all ready": f"{elapsed:.3f} s",
+        "device setup": f"avg {sum(setup_durations) / len(setup_durations):.3f} s"
+        f", max {max(setup_durations):.3f} s",
+        "messages/sec": f"{broker.delivered / elapsed:.0f}",
+        "tasks created": tasks_created,
+        "peak memory": f"{peak / 1024 / 1024:.2f} MiB",
+    }
+
+    # Without a restore the entities are added after the replay (ie. on ready)
+    if args.restore:
+        stats["state writes"] = sum(entity.state_writes for entity in entities)
+
+    if ingest_queue:
+        stats["ingest queue"] = (
+            f"max depth {ingest_queue.max_depth}, collapsed {ingest_queue.collapsed}"
+            f", overflow flushes {ingest_queue.overflow_flushes}"
+        )
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--nodes", type=int, default=2)
+    parser.add_argument("--properties", type=int, default=5)
+    parser.add_argument("--homie-version", default="3.0.1")
+    parser.add_argument("--base-topic", default="homie")
+    parser.add_argument("--shuffle", action="store_true")
+    parser.add_argument("--single-subscription", action="store_true")
+    parser.add_argument("--restore", action="store_true")
+    parser.add_argument("--ready-timeout", type=float, default=10)
+    parser.add_argument("--setup-concurrency", type=int, default=50)
+    parser.add_argument("--state-write-window", type=float, default=0.25)
+    parser.add_argument("--ingest-queue-size", type=int, default=10000)
+    parser.add_argument("--subscribe-latency", type=float, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="bench timeout")
+    args = parser.parse_args()
+
+    for key, value in asyncio.run(async_bench(args)).items():
+        print(f"{key + ':':<20} {value}")
+
+
+if __name__ == "__main__":
+    main()
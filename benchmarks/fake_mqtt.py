@@ -0,0 +1,263 @@
+"""Local stand-in for the Home Assistant MQTT transport (homeassistant.components.mqtt).
+
+The FakeBroker keeps the retained messages and delivers them to the subscriptions as
+HA does: @callback (not coroutine) message callbacks are called inline, coroutine
+ones are scheduled as task. The retained messages are replayed in the next event
+loop iteration after a subscribe (ie. as they come back from a real broker).
+
+load_homie_core() loads the Homie core package (homie/homie) wired to the
+FakeBroker: with Home Assistant installed only the MQTT functions are replaced,
+otherwise minimal stand-ins of homeassistant.core and homeassistant.components.mqtt
+are registered (the core uses only them)."""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import types
+import asyncio
+import importlib.util
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+HOMIE_CORE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "homie", "homie")
+
+
+@dataclass
+class ReceiveMessage:
+    """Same fields of homeassistant.components.mqtt.models.ReceiveMessage."""
+
+    topic: str
+    payload: str
+    qos: int
+    retain: bool
+    subscribed_topic: str
+    timestamp: float = field(default_factory=time.monotonic)
+
+
+def topic_match(topic_filter: str, topic: str) -> bool:
+    filter_lvls = topic_filter.split("/")
+    topic_lvls = topic.split("/")
+
+    for index, filter_lvl in enumerate(filter_lvls):
+        if filter_lvl == "#":
+            return True
+
+        if index >= len(topic_lvls) or filter_lvl not in ("+", topic_lvls[index]):
+            return False
+
+    return len(filter_lvls) == len(topic_lvls)
+
+
+class FakeBroker(object):
+    def __init__(self, subscribe_latency: float = 0):
+        # Seconds of a subscribe round-trip (ie. waiting the SUBACK)
+        self.subscribe_latency = subscribe_latency
+
+        self.retained: dict[str, str] = dict()
+        # Retained topics by levels (ie. indexed as a real broker does)
+        self._retained_tree: dict = dict()
+        self.subscriptions: list[tuple[str, Callable]] = list()
+
+        # Stats
+        self.subscribe_calls = 0
+        self.delivered = 0
+        self.published = list()
+
+    @property
+    def subscriptions_count(self) -> int:
+        return len(self.subscriptions)
+
+    def _deliver(self, callback: Callable, mqttmsg: ReceiveMessage):
+        self.delivered += 1
+
+        if asyncio.iscoroutinefunction(callback):
+            asyncio.get_running_loop().create_task(callback(mqttmsg))
+        else:
+            callback(mqttmsg)
+
+    def _replay_retained(self, subscription: tuple[str, Callable]):
+        topic_filter, callback = subscription
+
+        # Unsubscribed in the meanwhile
+        if subscription not in self.subscriptions:
+            return
+
+        for topic in list(self._retained_topics(topic_filter.split("/"))):
+            self._deliver(
+                callback,
+                ReceiveMessage(topic, self.retained[topic], 0, True, topic_filter),
+            )
+
+    def _retained_topics(self, filter_lvls: list[str], tree: dict = None):
+        tree = self._retained_tree if tree is None else tree
+
+        if not filter_lvls:
+            if (topic := tree.get(None)) is not None:
+                yield topic
+            return
+
+        filter_lvl, *filter_lvls = filter_lvls
+
+        if filter_lvl == "#":
+            stack = [tree]
+            while stack:
+                subtree = stack.pop()
+                for lvl, child in subtree.items():
+                    if lvl is None:
+                        yield child
+                    else:
+                        stack.append(child)
+
+        elif filter_lvl == "+":
+            for lvl, child in tree.items():
+                if lvl is not None:
+                    yield from self._retained_topics(filter_lvls, child)
+
+        elif (child := tree.get(filter_lvl)) is not None:
+            yield from self._retained_topics(filter_lvls, child)
+
+    async def async_subscribe(
+        self, hass, topic: str, msg_callback: Callable, qos: int = 0, encoding=None
+    ):
+        subscription = (topic, msg_callback)
+        self.subscriptions.append(subscription)
+        self.subscribe_calls += 1
+
+        if self.subscribe_latency:
+            await asyncio.sleep(self.subscribe_latency)
+
+        asyncio.get_running_loop().call_soon(self._replay_retained, subscription)
+
+        def async_unsubscribe():
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+        return async_unsubscribe
+
+    async def async_publish(
+        self, hass, topic: str, payload: Any, qos: int = 0, retain: bool = False
+    ):
+        payload = str(payload)
+        self.published.append((topic, payload, retain))
+        self.publish(topic, payload, retain)
+
+    def publish(self, topic: str, payload: str, retain: bool = True):
+        """Publish a message from a device (ie. outside HA)."""
+        if retain:
+            self.retain(topic, payload)
+
+        for topic_filter, callback in list(self.subscriptions):
+            if topic_match(topic_filter, topic):
+                self._deliver(
+                    callback, ReceiveMessage(topic, payload, 0, False, topic_filter)
+                )
+
+    def retain(self, topic: str, payload: str):
+        """Store a retained message without delivering it (see replay_retained())."""
+        self.retained[topic] = payload
+
+        tree = self._retained_tree
+        for lvl in topic.split("/"):
+            tree = tree.setdefault(lvl, dict())
+        tree[None] = topic
+
+    def replay_retained(self):
+        """Replay the retained messages to all the subscriptions (ie. reconnect)."""
+        for subscription in list(self.subscriptions):
+            self._replay_retained(subscription)
+
+    # homeassistant.components.mqtt.subscription
+    def async_prepare_subscribe_topics(self, hass, sub_state, topics: dict) -> dict:
+        return {"topics": topics, "unsubscribe": (sub_state or {}).get("unsubscribe")}
+
+    async def async_subscribe_topics(self, hass, sub_state: dict):
+        sub_state["unsubscribe"] = [
+            await self.async_subscribe(
+                hass, value["topic"], value["msg_callback"], value.get("qos", 0)
+            )
+            for value in sub_state["topics"].values()
+        ]
+
+    async def async_unsubscribe_topics(self, hass, sub_state: dict | None):
+        for async_unsubscribe in (sub_state or {}).get("unsubscribe") or []:
+            async_unsubscribe()
+
+
+class FakeHass(object):
+    """The few HomeAssistant methods used by the Homie core."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.data = dict()
+
+    def async_create_task(self, target):
+        return self.loop.create_task(target)
+
+
+def _install_stand_in_modules():
+    """Minimal homeassistant.core and homeassistant.components.mqtt modules."""
+
+    def callback(func):
+        setattr(func, "_hass_callback", True)
+        return func
+
+    modules = {
+        name: types.ModuleType(name)
+        for name in (
+            "homeassistant",
+            "homeassistant.core",
+            "homeassistant.components",
+            "homeassistant.components.mqtt",
+            "homeassistant.components.mqtt.models",
+            "homeassistant.components.mqtt.subscription",
+        )
+    }
+
+    modules["homeassistant.core"].HomeAssistant = FakeHass
+    modules["homeassistant.core"].callback = callback
+    modules["homeassistant.components.mqtt.models"].ReceiveMessage = ReceiveMessage
+
+    mqtt = modules["homeassistant.components.mqtt"]
+    mqtt.models = modules["homeassistant.components.mqtt.models"]
+    mqtt.subscription = modules["homeassistant.components.mqtt.subscription"]
+    modules["homeassistant"].core = modules["homeassistant.core"]
+    modules["homeassistant"].components = modules["homeassistant.components"]
+    modules["homeassistant.components"].mqtt = mqtt
+
+    sys.modules.update(modules)
+
+
+def install(broker: FakeBroker):
+    """Route the HA MQTT functions (used by the Homie core) to the broker."""
+    try:
+        import homeassistant.components.mqtt  # noqa: F401
+    except ImportError:
+        _install_stand_in_modules()
+
+    from homeassistant.components import mqtt
+    from homeassistant.components.mqtt import subscription
+
+    mqtt.async_subscribe = broker.async_subscribe
+    mqtt.async_publish = broker.async_publish
+    subscription.async_prepare_subscribe_topics = broker.async_prepare_subscribe_topics
+    subscription.async_subscribe_topics = broker.async_subscribe_topics
+    subscription.async_unsubscribe_topics = broker.async_unsubscribe_topics
+
+
+def load_homie_core(broker: FakeBroker, name: str = "homie_core"):
+    """Load the Homie core package (homie/homie) without the HA integration."""
+    install(broker)
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(
+        name,
+        os.path.join(HOMIE_CORE_PATH, "__init__.py"),
+        submodule_search_locations=[HOMIE_CORE_PATH],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,94 @@
+"""Synthetic Homie fleet generator (retained messages)."""
+from __future__ import annotations
+
+import random
+from typing import Iterator
+
+# (datatype, settable, $format, value)
+PROPERTY_TYPES = [
+    ("boolean", True, None, "true"),
+    ("float", False, None, "21.5"),
+    ("integer", True, "0:100", "42"),
+    ("percent", False, "0:100", "80"),
+    ("enum", True, "low,medium,high", "medium"),
+    ("string", False, None, "hello"),
+]
+
+
+def fleet_messages(
+    devices: int = 10,
+    nodes: int = 2,
+    properties: int = 5,
+    base_topic: str = "homie",
+    homie_version: str = "3.0.1",
+    shuffle: bool = False,
+    seed: int = 0,
+) -> Iterator[tuple[str, str]]:
+    """Yield the (topic, payload) retained messages of a synthetic fleet.
+
+    With shuffle the messages order is randomized (as some brokers replay them)."""
+
+    messages = list(
+        _device_messages(
+            base_topic, f"device-{device}", nodes, properties, homie_version
+        )
+        for device in range(devices)
+    )
+    messages = [message for device_messages in messages for message in device_messages]
+
+    if shuffle:
+        random.Random(seed).shuffle(messages)
+
+    yield from messages
+
+
+def _device_messages(
+    base_topic: str, device_id: str, nodes: int, properties: int, homie_version: str
+) -> Iterator[tuple[str, str]]:
+    device_topic = f"{base_topic}/{device_id}"
+    node_ids = [f"node-{node}" for node in range(nodes)]
+
+    yield f"{device_topic}/$homie", homie_version
+    yield f"{device_topic}/$name", f"Device {device_id}"
+    yield f"{device_topic}/$nodes", ",".join(node_ids)
+
+    if homie_version.startswith("3"):
+        yield f"{device_topic}/$localip", "192.168.1.10"
+        yield f"{device_topic}/$mac", "DE:AD:BE:EF:00:01"
+        yield f"{device_topic}/$fw/name", "bench-fw"
+        yield f"{device_topic}/$fw/version", "1.0.0"
+        yield f"{device_topic}/$implementation", "esp8266"
+        yield f"{device_topic}/$implementation/config", '{"wifi":{"ssid":"bench"}}'
+        yield f"{device_topic}/$implementation/version", "3.0.0"
+        yield f"{device_topic}/$stats/interval", "60"
+        yield f"{device_topic}/$stats/uptime", "3600"
+        yield f"{device_topic}/$stats/signal", "72"
+    else:
+        yield f"{device_topic}/$extensions", ""
+
+    for node_id in node_ids:
+        node_topic = f"{device_topic}/{node_id}"
+        property_ids = [f"property-{property}" for property in range(properties)]
+
+        yield f"{node_topic}/$name", f"Node {node_id}"
+        yield f"{node_topic}/$type", "bench"
+        yield f"{node_topic}/$properties", ",".join(property_ids)
+
+        for index, property_id in enumerate(property_ids):
+            property_topic = f"{node_topic}/{property_id}"
+            datatype, settable, format, value = PROPERTY_TYPES[
+                index % len(PROPERTY_TYPES)
+            ]
+
+            yield f"{property_topic}/$name", f"Property {property_id}"
+            yield f"{property_topic}/$datatype", datatype
+            yield f"{property_topic}/$settable", "true" if settable else "false"
+            yield f"{property_topic}/$retained", "true"
+            yield f"{property_topic}/$unit", "#"
+
+            if format:
+                yield f"{property_topic}/$format", format
+
+            yield property_topic, value
+
+    yield f"{device_topic}/$state", "ready"
@@ -1,9 +1,11 @@
+from __future__ import annotations
+
 import re
 import asyncio
 import logging
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import device_registry, dispatcher, config_validation as cv
@@ -12,11 +14,15 @@ from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 
 import homeassistant.components.mqtt as mqtt
 
-from .homie import HomieDevice
+from .homie import HomieDevice, HomieProperty, HomieRouter, HomieIngestQueue
+from .homie.utils import topic_match
 
+from .cache import HomieCache
+from .lifecycle import HomieLifecycle
 from .mixins import (
     async_create_ha_device,
     async_discover_properties,
+    async_remove_properties_entities,
 )
 
 from .utils import logger
@@ -26,17 +32,34 @@ from .const import (
     DOMAIN,
     DATA_HOMIE_CONFIG,
     DATA_KNOWN_DEVICES,
+    DATA_ROUTER,
+    DATA_INGEST_QUEUE,
+    DATA_LIFECYCLE,
     CONF_BASE_TOPIC,
     CONF_DISCOVERY,
     CONF_QOS,
     CONF_INCLUDE,
     CONF_EXCLUDE,
+    CONF_SINGLE_SUBSCRIPTION,
+    CONF_READY_TIMEOUT,
+    CONF_SETUP_CONCURRENCY,
+    CONF_CACHE,
+    CONF_INGEST_QUEUE_SIZE,
+    CONF_DEVICE_TTL,
     DEFAULT_BASE_TOPIC,
     DEFAULT_QOS,
     DEFAULT_DISCOVERY,
+    DEFAULT_SINGLE_SUBSCRIPTION,
+    DEFAULT_READY_TIMEOUT,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_CACHE,
+    DEFAULT_INGEST_QUEUE_SIZE,
+    DEFAULT_DEVICE_TTL,
     PLATFORMS,
     HOMIE_DISCOVERY_NEW_DEVICE,
+    HOMIE_DISCOVERY_NEW_DIAGNOSTICS,
     HOMIE_SUPPORTED_VERSION,
+    SINGLE_SUBSCRIPTION_TOPIC,
 )
 
 CONFIG_SCHEMA = vol.Schema(
@@ -54,6 +77,22 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(CONF_EXCLUDE, default=[]): vol.All(
                     cv.ensure_list, [cv.string]
                 ),
+                vol.Optional(
+                    CONF_SINGLE_SUBSCRIPTION, default=DEFAULT_SINGLE_SUBSCRIPTION
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_READY_TIMEOUT, default=DEFAULT_READY_TIMEOUT
+                ): cv.positive_float,
+                vol.Optional(
+                    CONF_SETUP_CONCURRENCY, default=DEFAULT_SETUP_CONCURRENCY
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_CACHE, default=DEFAULT_CACHE): cv.boolean,
+                vol.Optional(
+                    CONF_INGEST_QUEUE_SIZE, default=DEFAULT_INGEST_QUEUE_SIZE
+                ): cv.positive_int,
+                vol.Optional(CONF_DEVICE_TTL, default=DEFAULT_DEVICE_TTL): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
             }
         ),
     },
@@ -141,10 +180,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             )
         )
 
-    hass.async_create_task(async_setup_platforms())
+    platforms_setup = hass.async_create_task(async_setup_platforms())
 
     # Starting devices discovery
-    await _async_setup_discovery(hass, conf, entry)
+    await _async_setup_discovery(hass, conf, entry, platforms_setup)
 
     return True
 
@@ -159,7 +198,10 @@ DISCOVER_DEVICE = re.compile(
 
 @logger()
 async def _async_setup_discovery(
-    hass: HomeAssistant, conf: ConfigType, entry: ConfigEntry
+    hass: HomeAssistant,
+    conf: ConfigType,
+    entry: ConfigEntry,
+    platforms_setup: asyncio.Task | None = None,
 ) -> bool:
     """Start component (ie Discovery)."""
 
@@ -175,12 +217,35 @@ async def _async_setup_discovery(
     base_topic = conf.get(CONF_BASE_TOPIC).strip("/")
     discovery_topic = DISCOVERY_TOPIC.format(base_topic)
 
+    # One subscription for all devices, messages are dispatched by the router
+    router = HomieRouter() if conf.get(CONF_SINGLE_SUBSCRIPTION) else None
+
+    # Bound the nodes/properties subscribes running concurrently (all devices)
+    setup_semaphore = asyncio.Semaphore(conf.get(CONF_SETUP_CONCURRENCY))
+
+    # Buffer (and collapse) the messages bursts before the devices tree (0 disabled)
+    ingest_queue = (
+        HomieIngestQueue(max_size)
+        if (max_size := conf.get(CONF_INGEST_QUEUE_SIZE))
+        else None
+    )
+
+    # Saved for the diagnostics (see diagnostics.py)
+    hass.data[DATA_ROUTER] = router
+    hass.data[DATA_INGEST_QUEUE] = ingest_queue
+
+    # Last known devices tree (ie. entities added before the broker replay)
+    cache = HomieCache(hass, devices) if conf.get(CONF_CACHE) else None
+
+    # Devices with the entities already discovered (ie. restored from the cache)
+    discovered_devices = set()
+
     # Clear HA device registry (associated to the current config entry)
     # TODO: add HA service to clear all device (with relative entities)
     # dr = device_registry.async_get(hass)
     # dr.async_clear_config_entry(entry.entry_id)
 
-    @logger()
+    @logger(strip=True)
     async def async_discovery_message_received(mqttmsg: mqtt.models.ReceiveMessage):
         """Subscribed on discovery_topic."""
 
@@ -194,23 +259,38 @@ async def _async_setup_discovery(
 
             # Check if already discovered and added
             if device_id not in devices:
+                await async_add_device(f"{device_prefix_topic}/{device_id}")
+
+    async def async_add_device(
+        device_base_topic: str, snapshot: list | None = None
+    ) -> HomieDevice:
+        device = HomieDevice(
+            hass,
+            device_base_topic,
+            qos,
+            async_device_on_ready,
+            router=router,
+            ready_timeout=conf.get(CONF_READY_TIMEOUT),
+            setup_semaphore=setup_semaphore,
+            ingest_queue=ingest_queue,
+            async_on_update=async_device_on_update,
+        )
 
-                device = HomieDevice(
-                    hass,
-                    f"{device_prefix_topic}/{device_id}",
-                    qos,
-                    async_device_on_ready,
-                )
+        devices[device.id] = device
 
-                devices[device_id] = device
+        # Restored tree is reconciled by the live messages (after subscribe)
+        if snapshot:
+            device.restore(snapshot)
 
-                # Init (topics subscribe) device
-                await device.async_setup()
+        # Init (topics subscribe) device
+        await device.async_setup()
 
-                # Fire event to inform the presence of a new device in the global (hass.data) var
-                dispatcher.async_dispatcher_send(
-                    hass, HOMIE_DISCOVERY_NEW_DEVICE.format(device_id)
-                )
+        # Fire event to inform the presence of a new device in the global (hass.data) var
+        dispatcher.async_dispatcher_send(
+            hass, HOMIE_DISCOVERY_NEW_DEVICE.format(device.id)
+        )
+
+        return device
 
     @logger()
     async def async_device_on_ready(homie_device: HomieDevice):
@@ -219,18 +299,123 @@ async def _async_setup_discovery(
         # Add/update device to HA device registry
         async_create_ha_device(hass, homie_device, entry)
 
-        if discovery_enabled:
-            async_discover_properties(hass, homie_device)
+        # Properties changed after the restore are discovered as the live delta
+        # (see async_device_on_update)
+        if homie_device.id not in discovered_devices:
+            discovered_devices.add(homie_device.id)
+
+            if discovery_enabled:
+                async_discover_properties(hass, homie_device)
+
+            # Ingestion metrics of the device (see sensor.py)
+            dispatcher.async_dispatcher_send(
+                hass, HOMIE_DISCOVERY_NEW_DIAGNOSTICS, homie_device
+            )
+
+        if cache:
+            cache.async_schedule_save()
+
+    @logger()
+    async def async_device_on_update(
+        homie_device: HomieDevice,
+        added: list[HomieProperty],
+        removed: list[HomieProperty],
+    ):
+        """Nodes/properties re-announced (eg. firmware update): remove the entities
+        of the properties removed and discover only the added ones."""
+
+        # Even if not discovered yet: the entities are registered since a previous run
+        if removed:
+            async_remove_properties_entities(hass, removed)
+
+        # Not discovered yet: the whole (updated) tree is discovered on ready
+        if added and discovery_enabled and homie_device.id in discovered_devices:
+            async_discover_properties(hass, homie_device, properties=added)
+
+        if cache:
+            cache.async_schedule_save()
+
+    async def async_device_restored(homie_device: HomieDevice):
+        """Add the entities as soon as the restored tree is created."""
+        try:
+            await asyncio.wait_for(
+                homie_device.async_nodes_ready(), conf.get(CONF_READY_TIMEOUT)
+            )
+        except asyncio.TimeoutError:
+            # Entities added on device ready (ie. live)
+            return
+
+        # The platforms must listen the discovery
+        if platforms_setup:
+            await platforms_setup
+
+        await async_device_on_ready(homie_device)
+
+    async def async_device_evicted(homie_device: HomieDevice):
+        """Remove the evicted device (and its entities) from HA."""
+        discovered_devices.discard(homie_device.id)
+
+        dr = device_registry.async_get(hass)
+
+        if device_entry := dr.async_get_device({(DOMAIN, homie_device.id)}):
+            dr.async_remove_device(device_entry.id)
+
+        if cache:
+            cache.async_schedule_save()
+
+    # Evict the devices stale for more than device_ttl seconds (0 disabled)
+    lifecycle = (
+        HomieLifecycle(hass, devices, ttl, async_device_evicted)
+        if (ttl := conf.get(CONF_DEVICE_TTL))
+        else None
+    )
+
+    hass.data[DATA_LIFECYCLE] = lifecycle
 
     async def async_destroy(event):
         """Stuff to do on close"""
-        pass
+        if lifecycle:
+            lifecycle.async_stop()
+
+        if cache:
+            await cache.async_save()
 
     # Call on HA close
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_destroy)
 
+    if lifecycle:
+        lifecycle.async_start()
+
+    if cache:
+        for device_id, (base_topic, records) in (await cache.async_load()).items():
+            if device_id not in devices:
+                device = await async_add_device(base_topic, records)
+                hass.async_create_task(async_device_restored(device))
+
+    if router is None:
+        await mqtt.async_subscribe(
+            hass, discovery_topic, async_discovery_message_received, qos
+        )
+
+        return True
+
+    discovery_topic_levels = discovery_topic.split("/")
+
+    @callback
+    def async_message_received(mqttmsg: mqtt.models.ReceiveMessage):
+        """Subscribed on the whole base_topic (ie. single subscription)."""
+
+        router.route(mqttmsg)
+
+        # Task only for the discovery messages (not one for each message)
+        if topic_match(discovery_topic_levels, mqttmsg.topic.split("/")):
+            hass.async_create_task(async_discovery_message_received(mqttmsg))
+
     await mqtt.async_subscribe(
-        hass, discovery_topic, async_discovery_message_received, qos
+        hass,
+        SINGLE_SUBSCRIPTION_TOPIC.format(base_topic),
+        async_message_received,
+        qos,
     )
 
     return True
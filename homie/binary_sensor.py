@@ -1,5 +1,4 @@
 import logging
-import asyncio
 import functools
 import voluptuous as vol
 
@@ -53,10 +52,10 @@ async def async_setup_platform(
     """Called if exist a platform entry (ie. 'platform: homie') in configuration.yaml"""
     device_id = config[CONF_PROPERTY][CONF_DEVICE]
 
-    # Workaround to bind entity and device (calling directly "_async_setup_entity" don't work)
-    # setup = functools.partial(_async_setup_entity, hass, async_add_entities, config)
+    # Workaround to bind entity and device (calling directly "_async_setup_entities" don't work)
+    # setup = functools.partial(_async_setup_entities, hass, async_add_entities, [config])
     setup = functools.partial(
-        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(BINARY_SENSOR), config
+        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(BINARY_SENSOR), [config]
     )
 
     # Avoid to create a new Home Device but wait its discovered first
@@ -69,18 +68,23 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     Called by hass.config_entries.async_forward_entry_setup() in async_setup_entry() component."""
     setup = functools.partial(
-        _async_setup_entity, hass, async_add_entities, config_entry=config_entry
+        _async_setup_entities, hass, async_add_entities, config_entry=config_entry
     )
 
     # Listening on new domain platfrom (eg binary_sensor) discovered and init the setup
     await async_setup_entry_helper(hass, BINARY_SENSOR, setup, PLATFORM_SCHEMA)
 
 
-async def _async_setup_entity(hass, async_add_entities, config, config_entry=None):
-    """Setup the HA binary_sensor with an HomieProperty."""
+async def _async_setup_entities(hass, async_add_entities, configs, config_entry=None):
+    """Setup the HA binary_sensors (in one batch) with the HomieProperties."""
 
-    homie_property = await entity_base.async_get_homie_property(hass, config)
-    async_add_entities([HomieBinarySensor(hass, homie_property, config, config_entry)])
+    homie_properties = await entity_base.async_get_homie_properties(hass, configs)
+    async_add_entities(
+        [
+            HomieBinarySensor(hass, homie_property, config, config_entry)
+            for homie_property, config in homie_properties
+        ]
+    )
 
 
 class HomieBinarySensor(entity_base.HomieEntity, binary_sensor.BinarySensorEntity):
@@ -98,20 +102,45 @@ class HomieBinarySensor(entity_base.HomieEntity, binary_sensor.BinarySensorEntit
             self, hass, homie_property, config, config_entry
         )
 
-    async def _async_on_property_change(self, homie_property, topic, value):
+        self._async_cancel_off_delay = None
+
+    async def async_will_remove_from_hass(self):
+        """Unsubscribe from HomieProperty events and cancel the off delay."""
+        await super().async_will_remove_from_hass()
+        self._cancel_off_delay()
+
+    def _cancel_off_delay(self):
+        if self._async_cancel_off_delay:
+            self._async_cancel_off_delay()
+            self._async_cancel_off_delay = None
+
+    @callback
+    def _async_on_property_change(self, homie_property, topic, value):
         """Called on property topic change."""
 
-        # Apply a delay (CONF_OFF_DELAY) on False
-        if (
-            (off_delay := self._config.get(CONF_OFF_DELAY))
-            and topic == ""
-            and str2bool(self._homie_property.value) is False
-        ):
-            await asyncio.sleep(off_delay)
+        if (off_delay := self._config.get(CONF_OFF_DELAY)) and topic == "":
+            # A new value supersedes the delayed False
+            self._cancel_off_delay()
 
-        await super()._async_on_property_change(homie_property, topic, value)
+            # Apply a delay (CONF_OFF_DELAY) on False
+            if self.is_on is False:
+                self._async_cancel_off_delay = event.async_call_later(
+                    self.hass, off_delay, self._async_off_delay_elapsed
+                )
+                return
+
+        super()._async_on_property_change(homie_property, topic, value)
+
+    @callback
+    def _async_off_delay_elapsed(self, _now):
+        """Called after CONF_OFF_DELAY seconds from the False value."""
+        self._async_cancel_off_delay = None
+        self._async_schedule_write_ha_state(immediate=True)
 
     @property
     def is_on(self):
         """Returns true if the Homie BinarySensor is on."""
-        return str2bool(self._homie_property.value)
+        value = self._homie_property.typed_value
+
+        # Decoded by the property on boolean datatype
+        return value if isinstance(value, bool) else str2bool(value)
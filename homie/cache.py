@@ -0,0 +1,141 @@
+"""Persistent cache of the Homie devices tree (ie. warm startup)."""
+from __future__ import annotations
+
+import os
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import event
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .homie import HomieDevice
+from .homie.topic_dict import dump_jsonl, load_jsonl
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 2
+STORAGE_KEY = f"{DOMAIN}.devices"
+
+# JSON lines: a header line for each device, followed by its snapshot records
+STORAGE_FILE = f"{STORAGE_KEY}.jsonl"
+
+# Previous cache (HA Store, nested snapshots): not restored, removed on first load
+LEGACY_STORAGE_FILE = STORAGE_KEY
+
+# Seconds to delay (and group) the saves on devices ready
+SAVE_DELAY = 30
+
+
+class HomieCache(object):
+    """Save and load the snapshot (see HomieDevice.snapshot()) of the known devices.
+
+    The file is written and read (streamed, one line at a time) in the executor:
+    '{"version": 2}', then '{"id": ..., "base_topic": ...}' and the
+    '["topic","value"]' records of each device (see topic_dict.dump_jsonl())."""
+
+    def __init__(self, hass: HomeAssistant, devices: dict[str, HomieDevice]):
+        self._hass = hass
+        self._path = hass.config.path(STORAGE_DIR, STORAGE_FILE)
+        self._legacy_path = hass.config.path(STORAGE_DIR, LEGACY_STORAGE_FILE)
+        self._devices = devices
+        self._async_cancel_save = None
+
+    async def async_load(self) -> dict[str, tuple[str, list]]:
+        """Return the saved (base topic, snapshot records) by device id."""
+        try:
+            return await self._hass.async_add_executor_job(self._load)
+        except FileNotFoundError:
+            await self._hass.async_add_executor_job(self._remove_legacy)
+            return {}
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error loading %s, devices not restored", self._path)
+            return {}
+
+    def _load(self) -> dict[str, tuple[str, list]]:
+        snapshots = dict()
+        records = None
+
+        with open(self._path, encoding="utf-8") as fp:
+            records_iter = load_jsonl(fp)
+
+            # File header, a different version (or format) is not restored
+            header = next(records_iter, None)
+            version = header.get("version") if isinstance(header, dict) else None
+
+            if version != STORAGE_VERSION:
+                _LOGGER.warning(
+                    "Unsupported version %s of %s, devices not restored",
+                    version,
+                    self._path,
+                )
+                return snapshots
+
+            for record in records_iter:
+                # Device header
+                if isinstance(record, dict):
+                    records = list()
+                    snapshots[record["id"]] = (record["base_topic"], records)
+
+                elif records is not None:
+                    records.append(record)
+
+        return snapshots
+
+    def _remove_legacy(self):
+        try:
+            os.remove(self._legacy_path)
+        except FileNotFoundError:
+            return
+        except OSError:
+            _LOGGER.exception("Error removing %s", self._legacy_path)
+            return
+
+        _LOGGER.info("Previous cache %s removed", self._legacy_path)
+
+    @callback
+    def async_schedule_save(self):
+        if self._async_cancel_save is None:
+            self._async_cancel_save = event.async_call_later(
+                self._hass, SAVE_DELAY, self._async_save_scheduled
+            )
+
+    async def _async_save_scheduled(self, _now):
+        self._async_cancel_save = None
+        await self.async_save()
+
+    async def async_save(self):
+        if self._async_cancel_save:
+            self._async_cancel_save()
+            self._async_cancel_save = None
+
+        # Snapshots taken on the event loop (ie. the trees are not thread-safe)
+        records = self._data_to_save()
+
+        try:
+            await self._hass.async_add_executor_job(self._save, records)
+        except OSError:
+            _LOGGER.exception("Error saving %s", self._path)
+
+    def _save(self, records: list):
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        tmp_path = f"{self._path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            dump_jsonl(records, fp)
+
+        os.replace(tmp_path, self._path)
+
+    @callback
+    def _data_to_save(self) -> list:
+        records: list[Any] = [{"version": STORAGE_VERSION}]
+
+        # Only the devices received live (ie. not restored and disappeared)
+        for device in self._devices.values():
+            if device.t["$state"] is not None:
+                records.append({"id": device.id, "base_topic": device.base_topic})
+                records.extend(device.snapshot())
+
+        return records
@@ -10,12 +10,16 @@ from homeassistant.const import (
 )
 from homeassistant.components.mqtt import CONF_DISCOVERY, CONF_QOS
 from .homie import TRUE, FALSE
+from .homie.component import DEFAULT_READY_TIMEOUT
 
 DOMAIN = "homie"
 
 # hass.data keys
 DATA_HOMIE_CONFIG = f"{DOMAIN}-config"
 DATA_KNOWN_DEVICES = f"{DOMAIN}-devices"
+DATA_ROUTER = f"{DOMAIN}-router"
+DATA_INGEST_QUEUE = f"{DOMAIN}-ingest-queue"
+DATA_LIFECYCLE = f"{DOMAIN}-lifecycle"
 
 # configuration keys
 CONF_BASE_TOPIC = "base_topic"
@@ -24,19 +28,35 @@ CONF_DEVICE = "device"
 CONF_NODE = "node"
 CONF_PROPERTY = "property"
 CONF_PROPERTY_TOPIC = f"{CONF_PROPERTY}_topic"
+CONF_SINGLE_SUBSCRIPTION = "single_subscription"
+CONF_STATE_WRITE_WINDOW = "state_write_window"
+CONF_COMMAND_WINDOW = "command_window"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_READY_TIMEOUT = "ready_timeout"
+CONF_SETUP_CONCURRENCY = "setup_concurrency"
+CONF_CACHE = "cache"
+CONF_INGEST_QUEUE_SIZE = "ingest_queue_size"
+CONF_DEVICE_TTL = "device_ttl"
 
 # configuration default
 DEFAULT_BASE_TOPIC = "+"
 DEFAULT_QOS = 1
 DEFAULT_DISCOVERY = True
+DEFAULT_SINGLE_SUBSCRIPTION = False
+DEFAULT_SETUP_CONCURRENCY = 50
+DEFAULT_CACHE = True
+DEFAULT_INGEST_QUEUE_SIZE = 10000
+DEFAULT_DEVICE_TTL = 0
 
 # signals/events
 HOMIE_DISCOVERY_NEW = f"{DOMAIN}_discovery_new_{{}}"
 HOMIE_DISCOVERY_NEW_DEVICE = f"{DOMAIN}_discovery_new_{CONF_DEVICE}_{{}}"
+HOMIE_DISCOVERY_NEW_DIAGNOSTICS = f"{DOMAIN}_discovery_new_diagnostics"
 
 # useful consts
 HOMIE_SUPPORTED_VERSION = ["3.0", "3.0.0", "3.0.1", "4.0", "4.0.0"]
 DISCOVERY_TOPIC = "{}/+/$homie"
+SINGLE_SUBSCRIPTION_TOPIC = "{}/#"
 DEVICE = CONF_DEVICE
 NODE = CONF_NODE
 PROPERTY = CONF_PROPERTY
@@ -0,0 +1,100 @@
+"""Diagnostics (ie. ingestion metrics) of the Homie config entry."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+
+from .homie import HomieDevice
+from .homie.metrics import Histogram
+
+from .const import DATA_KNOWN_DEVICES, DATA_ROUTER, DATA_INGEST_QUEUE, DATA_LIFECYCLE
+
+# Chattiest devices/properties listed on top
+TOP_CHATTY = 10
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the global and per device (node, property) ingestion metrics."""
+    devices: dict[str, HomieDevice] = hass.data.get(DATA_KNOWN_DEVICES, {})
+    router = hass.data.get(DATA_ROUTER)
+    ingest_queue = hass.data.get(DATA_INGEST_QUEUE)
+    lifecycle = hass.data.get(DATA_LIFECYCLE)
+
+    devices_metrics = {
+        device_id: device.metrics() for device_id, device in devices.items()
+    }
+
+    totals = dict.fromkeys(("messages", "bytes", "filtered", "suppressed"), 0)
+    ready_duration = Histogram()
+
+    for metrics in devices_metrics.values():
+        for key in totals:
+            totals[key] += metrics[key]
+
+        if metrics["ready_duration"] is not None:
+            ready_duration.observe(metrics["ready_duration"])
+
+    properties_messages = [
+        (homie_property.base_topic, homie_property.received_messages)
+        for device in devices.values()
+        for homie_property in device.query_properties()
+    ]
+
+    return {
+        "config": dict(entry.data),
+        "totals": {**totals, "devices": len(devices)},
+        "ready_duration": ready_duration.as_dict(),
+        "ingest_queue": ingest_queue
+        and {
+            "depth": ingest_queue.depth,
+            "max_depth": ingest_queue.max_depth,
+            "processed": ingest_queue.processed,
+            "collapsed": ingest_queue.collapsed,
+            "dropped": ingest_queue.dropped,
+            "overflow_flushes": ingest_queue.overflow_flushes,
+        },
+        "router": router
+        and {
+            "pending": router.pending,
+            "dropped": router.dropped,
+            "expired": router.expired,
+        },
+        "lifecycle": lifecycle
+        and {
+            "ttl": lifecycle.ttl,
+            "stale": lifecycle.stale,
+            "evicted": lifecycle.evicted,
+            "reclaimed": lifecycle.reclaimed,
+        },
+        "chattiest_devices": sorted(
+            (
+                (device_id, metrics["messages"])
+                for device_id, metrics in devices_metrics.items()
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:TOP_CHATTY],
+        "chattiest_properties": sorted(
+            properties_messages, key=lambda item: item[1], reverse=True
+        )[:TOP_CHATTY],
+        "devices": {
+            device_id: {
+                **devices_metrics[device_id],
+                "nodes": {
+                    node_id: {
+                        **node.counters(),
+                        "properties": {
+                            property_id: homie_property.counters()
+                            for property_id, homie_property in node.properties.items()
+                        },
+                    }
+                    for node_id, node in device.nodes.items()
+                },
+            }
+            for device_id, device in devices.items()
+        },
+    }
@@ -1,7 +1,7 @@
 import logging
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import device_registry, config_validation as cv
 from homeassistant.helpers.entity import Entity
@@ -9,7 +9,7 @@ from homeassistant.helpers.typing import ConfigType
 
 from homeassistant.components.mqtt import valid_subscribe_topic, valid_qos_schema
 
-from .homie import HomieDevice, HomieProperty
+from .homie import HomieDevice, HomieProperty, HomiePropertyObserver
 
 from .const import (
     DOMAIN,
@@ -21,6 +21,7 @@ from .const import (
     CONF_UNIQUE_ID,
     CONF_DEVICE_CLASS,
     CONF_ENABLED_BY_DEFAULT,
+    CONF_STATE_WRITE_WINDOW,
     CONF_DEVICE,
     CONF_NODE,
     CONF_PROPERTY,
@@ -37,6 +38,9 @@ SCHEMA_BASE = vol.Schema(
         vol.Optional(CONF_UNIQUE_ID): cv.string,
         vol.Optional(CONF_ENABLED_BY_DEFAULT, default=True): cv.boolean,
         vol.Optional(CONF_QOS, default=DEFAULT_QOS): valid_qos_schema,
+        vol.Optional(CONF_STATE_WRITE_WINDOW): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
         vol.Exclusive(CONF_PROPERTY, "property"): vol.Schema(
             {
                 vol.Required(CONF_DEVICE): cv.string,
@@ -49,7 +53,7 @@ SCHEMA_BASE = vol.Schema(
 )
 
 
-class HomieEntity(Entity):
+class HomieEntity(Entity, HomiePropertyObserver):
     """Implementation of a Homie Switch."""
 
     def __init__(
@@ -68,52 +72,49 @@ class HomieEntity(Entity):
         self._homie_node = homie_property.node
         self._homie_device = homie_property.node.device
 
+        # Seconds to coalesce state writes (default of the class if not in config)
+        self._state_write_window = self._config.get(
+            CONF_STATE_WRITE_WINDOW, self._state_write_window
+        )
+
+        # (property attributes, device attributes, merged)
+        self._state_attributes = (None, None, None)
+
     async def async_added_to_hass(self):
         """Subscribe to HomieProperty events."""
         # await self._homie_property.node.device.async_setup()
-
-        self._homie_device.subscribe(self._async_on_device_change)
-        self._homie_property.subscribe(self._async_on_property_change)
+        self._async_subscribe_homie()
 
     async def async_will_remove_from_hass(self):
-        # TODO: unsbscribe topics
-        pass
-
-    async def _async_on_device_change(self, homie_component, topic, value):
-        """Callend on device topic or childrens (ie. nodes, property) change."""
-        if isinstance(homie_component, HomieDevice):
-            self.async_write_ha_state()
-
-    async def _async_on_property_change(self, homie_property, topic, value):
-        """Callend on property topic change."""
-        if topic != "set":
-            self.async_write_ha_state()
+        """Unsubscribe from HomieProperty events."""
+        self._async_unsubscribe_homie()
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
 
-        property_attrs = {
-            f"attr-{topic.lstrip('$')}": value
-            for topic, value in self._homie_property.t.dict_value().items()
-        }
+        # Cached by the components and rebuilt only on their attributes change
+        # note: the device ones are shared by all the device entities
+        property_attrs = self._homie_property.cached(property_state_attributes)
+        device_attrs = self._homie_device.cached(device_state_attributes)
 
-        stats = {
-            f"stat-{topic}": value
-            for topic, value in self._homie_device.t.get_obj("$stats")
-            .dict_value()
-            .items()
-        }
+        cached_property_attrs, cached_device_attrs, attrs = self._state_attributes
+
+        if (
+            property_attrs is cached_property_attrs
+            and device_attrs is cached_device_attrs
+        ):
+            return attrs
 
-        return {
+        attrs = {
             "base_topic": self._homie_property.base_topic,
             **property_attrs,
-            **stats,
-            "ip": self._homie_device.t["$localip"],
-            "device-config": self._homie_device.t["$implementation/config"],
-            "state": self._homie_device.t["$state"],
+            **device_attrs,
         }
 
+        self._state_attributes = (property_attrs, device_attrs, attrs)
+        return attrs
+
     @property
     def device_info(self):
         """Return the device info."""
@@ -176,6 +177,29 @@ class HomieEntity(Entity):
         return self._config.get(CONF_UNIQUE_ID, self._homie_property.base_topic)
 
 
+def property_state_attributes(homie_property: HomieProperty) -> dict:
+    """Return the property part of the entity state attributes."""
+    return {
+        f"attr-{topic.lstrip('$')}": value
+        for topic, value in homie_property.t.dict_value().items()
+    }
+
+
+def device_state_attributes(homie_device: HomieDevice) -> dict:
+    """Return the device part of the entity state attributes."""
+    stats = {
+        f"stat-{topic}": value
+        for topic, value in homie_device.t.get_obj("$stats").dict_value().items()
+    }
+
+    return {
+        **stats,
+        "ip": homie_device.t["$localip"],
+        "device-config": homie_device.t["$implementation/config"],
+        "state": homie_device.t["$state"],
+    }
+
+
 async def async_get_homie_property(
     hass: HomeAssistant, config: ConfigType
 ) -> HomieProperty:
@@ -197,6 +221,25 @@ async def async_get_homie_property(
     return device[node_id][property_id]
 
 
+async def async_get_homie_properties(
+    hass: HomeAssistant, configs: list[ConfigType]
+) -> list[tuple[HomieProperty, ConfigType]]:
+    """Return the (HomieProperty, config) of the configs, skipping the not existing."""
+    homie_properties = list()
+
+    for config in configs:
+        try:
+            homie_properties.append(
+                (await async_get_homie_property(hass, config), config)
+            )
+        except ValueError as err:
+            _LOGGER.error(
+                "Homie property of %s not found: %s", config[CONF_PROPERTY], err
+            )
+
+    return homie_properties
+
+
 def schema_post_processing(config: ConfigType) -> ConfigType:
     """Convert property topic path string in the dict form and
     validate entry has at least one property value."""
@@ -1,5 +1,8 @@
 TRUE = "true"
 FALSE = "false"
 
-from .topic_dict import Observable, TopicDict, TopicNode
+from .topic_dict import Observable, TopicDict, TopicNode, topic_path
 from .component import HomieDevice, HomieNode, HomieProperty
+from .router import HomieRouter
+from .ingest import HomieIngestQueue
+from .observer import HomiePropertyObserver
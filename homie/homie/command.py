@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.components import mqtt
+
+from .datatype import decode_value
+from .topic_dict import Observable
+
+if TYPE_CHECKING:
+    from .component import HomieProperty
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to coalesce the successive sets (eg. slider dragging)
+DEFAULT_COMMAND_WINDOW = 0.3
+# Seconds to wait the device echo of a set (then the assumed value is rolled back)
+DEFAULT_COMMAND_TIMEOUT = 10
+
+
+class HomieCommand(Observable):
+    """Outbound commands (ie. '{property}/set' publishes) of a settable property.
+
+    The first set is published immediately, the following ones in the window are
+    coalesced to the latest and published at the window end. A set equal to the
+    last state received from the device (and with nothing in flight) is not
+    published.
+
+    The latest set is the assumed value (ie. optimistic state, kept out of the
+    topic tree) until the device echoes it on the state topic, or it's rolled back
+    after the timeout. Its changes are notified only to the command subscribers
+    (ie. the optimistic entities). The set => echo round-trip is recorded in the
+    device command_latency.
+
+    window and timeout are the defaults of the sets without their own (the
+    command is shared by all the entities of the property)."""
+
+    def __init__(
+        self,
+        homie_property: HomieProperty,
+        window: float = DEFAULT_COMMAND_WINDOW,
+        timeout: float = DEFAULT_COMMAND_TIMEOUT,
+    ):
+        Observable.__init__(self)
+        self._property = homie_property
+        self.window = window
+        self.timeout = timeout
+
+        # Last state received from the device
+        self._acked: str | None = homie_property.value
+        # Latest set (and its timeout) waiting the window end
+        self._pending: str | None = None
+        self._pending_timeout: float | None = None
+        self._window_handle: asyncio.TimerHandle | None = None
+        # Window of the set that opened it
+        self._window: float | None = None
+        # (payload, publish time) waiting the device echo
+        self._inflight: tuple[str, float] | None = None
+        self._timeout_handle: asyncio.TimerHandle | None = None
+
+        # Latest set not echoed yet
+        self.assumed: str | None = None
+
+        # Stats
+        self.published = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.echoed = 0
+        self.timeouts = 0
+        self.last_latency: float | None = None
+
+    def _last_sent(self) -> str | None:
+        return self._inflight[0] if self._inflight else self._acked
+
+    def _same_value(self, payload: str | None, other: str | None) -> bool:
+        """Compare two payloads decoded by the property datatype (ie. a device can
+        normalize the echo, eg. '21.5' as '21.50' or '1' as '1.0')."""
+        if payload == other:
+            return True
+
+        if payload is None or other is None:
+            return False
+
+        datatype = self._property.datatype
+        value = decode_value(datatype, payload)
+
+        return value is not None and value == decode_value(datatype, other)
+
+    def _set_assumed(self, payload: str | None):
+        if payload != self.assumed:
+            self.assumed = payload
+            self._call_subscribers("", self._property)
+
+    async def async_set(
+        self, payload: str, window: float | None = None, timeout: float | None = None
+    ):
+        window = self.window if window is None else window
+        timeout = self.timeout if timeout is None else timeout
+
+        # Window open: only the latest is published (at the window end)
+        if self._window_handle is not None:
+            if self._pending is not None:
+                self.coalesced += 1
+
+            self._pending, self._pending_timeout = payload, timeout
+            self._set_assumed(payload)
+            return
+
+        # Already the device state (note: an unechoed set is published again)
+        if self._inflight is None and self._same_value(payload, self._acked):
+            self.skipped += 1
+            self._set_assumed(None)
+            return
+
+        if window:
+            self._window = window
+            self._window_handle = asyncio.get_running_loop().call_later(
+                window, self._async_window_end
+            )
+
+        self._set_assumed(payload)
+        await self._async_publish(payload, timeout)
+
+    @callback
+    def _async_window_end(self):
+        self._window_handle = None
+        payload, self._pending = self._pending, None
+
+        if payload is None:
+            return
+
+        # Same of the set just published (or of the device state)
+        if self._same_value(payload, self._last_sent()):
+            self.skipped += 1
+
+            if self._same_value(payload, self._acked):
+                self._set_assumed(None)
+            return
+
+        # Keep coalescing the sets following this publish
+        self._window_handle = asyncio.get_running_loop().call_later(
+            self._window, self._async_window_end
+        )
+
+        self._property._hass.async_create_task(
+            self._async_publish(payload, self._pending_timeout)
+        )
+
+    async def _async_publish(self, payload: str, timeout: float):
+        self._inflight = (payload, time.monotonic())
+        self.published += 1
+
+        if self._timeout_handle is not None:
+            self._timeout_handle.cancel()
+
+        self._timeout_handle = asyncio.get_running_loop().call_later(
+            timeout, self._async_echo_timeout, timeout
+        )
+
+        await mqtt.async_publish(
+            self._property._hass,
+            f"{self._property.base_topic}/set",
+            payload,
+            self._property._qos,
+            retain=True,
+        )
+
+    @callback
+    def _async_on_state(self, payload: str):
+        """Called on the property state received from the device."""
+        self._acked = payload
+
+        # Echoed: the subscribers are notified by the state change
+        if self._pending is None and self._same_value(payload, self.assumed):
+            self.assumed = None
+
+        if self._inflight is None or not self._same_value(self._inflight[0], payload):
+            return
+
+        latency = time.monotonic() - self._inflight[1]
+        self._inflight = None
+        self._timeout_handle.cancel()
+        self._timeout_handle = None
+
+        self.echoed += 1
+        self.last_latency = latency
+        self._property.node.device.command_latency.observe(latency)
+
+        _LOGGER.debug(
+            "Property '%s' set echoed in %.3fs", self._property.base_topic, latency
+        )
+
+    @callback
+    def _async_echo_timeout(self, timeout: float):
+        """The device didn't echo the set: roll back the assumed value."""
+        self._timeout_handle = None
+        self._inflight = None
+        self.timeouts += 1
+        self._property.node.device.command_timeouts += 1
+
+        _LOGGER.warning(
+            "Property '%s' set not echoed in %ss, assumed value rolled back",
+            self._property.base_topic,
+            timeout,
+        )
+
+        if self._pending is None:
+            self._set_assumed(None)
+
+    @callback
+    def async_cancel(self):
+        """Drop the pending set and the echo wait (eg. on unsubscribe)."""
+        for handle in (self._window_handle, self._timeout_handle):
+            if handle is not None:
+                handle.cancel()
+
+        self._window_handle = self._timeout_handle = None
+        self._pending = self._inflight = None
+        self.assumed = None
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import re
+import time
 import asyncio
+import logging
+import functools
 from abc import abstractmethod
-from typing import Callable
+from typing import Any, Callable, Iterable, Iterator
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.components import mqtt
@@ -11,10 +14,53 @@ from homeassistant.components.mqtt import subscription
 
 from . import FALSE
 from .topic_dict import Observable, TopicDict
+from .router import HomieRouter
+from .ingest import HomieIngestQueue
+from .datatype import decode_value, encode_value, decode_format
+from .command import HomieCommand
+from .metrics import Histogram, CALLBACK_BUCKETS
 from .utils import str2bool
 
+_LOGGER = logging.getLogger(__name__)
+
+# Max seconds to wait the whole device tree (nodes, properties and attributes)
+DEFAULT_READY_TIMEOUT = 10
+
+# Attributes that must be received to consider a property complete
+PROPERTY_REQUIRED_ATTRS = ("$name", "$datatype")
+PROPERTY_REQUIRED_FORMAT_DATATYPES = ("enum", "color")
+
+# Optional attributes that change the entity (eg. switch vs binary_sensor): after
+# the required ones they are waited (if not received yet) for the grace seconds
+# note: neither the convention nor the retained replay guarantee any order
+PROPERTY_OPTIONAL_ATTRS = ("$settable", "$unit")
+PROPERTY_OPTIONAL_GRACE = 0.25
+
+# Typed value not decoded yet (None is a valid decoded value)
+_UNDECODED = object()
+
+# Attributes not saved in the snapshots (ie. volatile)
+SNAPSHOT_EXCLUDE_TOPICS = ("$state", "$stats")
+
+# Properties attributes indexed in the device tree (see HomieDevice.query_properties())
+PROPERTY_INDEXED_ATTRS = ("$datatype", "$settable", "$unit")
+
 
 class HomieBase(Observable):
+    # Topics (relative to base_topic) to subscribe
+    SUB_TOPICS: dict[str, str] = {}
+    SUB_TOPICS_LEVELS: list[list[str]] = []
+
+    # The '+' subscription receives the children values too (ie. '{child-id}'),
+    # they are ingested (and counted) only by the child itself
+    HAS_CHILDREN = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.SUB_TOPICS_LEVELS = [
+            sub_topic.split("/") for sub_topic in cls.SUB_TOPICS.values()
+        ]
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -22,6 +68,10 @@ class HomieBase(Observable):
         qos: int = 0,
         topic_dict: TopicDict = None,
         async_on_ready: Callable | None = None,
+        router: HomieRouter | None = None,
+        setup_semaphore: asyncio.Semaphore | None = None,
+        ingest_queue: HomieIngestQueue | None = None,
+        ingest_time: Histogram | None = None,
     ):
         Observable.__init__(self)
         self.id, self.base_topic = TopicDict.topic_get_head(base_topic)
@@ -32,30 +82,142 @@ class HomieBase(Observable):
                 % self.base_topic
             )
 
+        self._topic_offset = len(self.base_topic) + 1
+
         self.topic_dict = topic_dict if topic_dict else TopicDict()
         self.topic_dict.subscribe(self._async_update_topic_dict)
 
         self._async_on_ready = async_on_ready
         self._hass = hass
         self._qos = qos
+        self._router = router
+        self._setup_semaphore = setup_semaphore
+        self._ingest_queue = ingest_queue
+
+        # Callbacks execution time of the whole device (shared with the children)
+        self.ingest_time = ingest_time
+
+        # Messages (and payload length) received on the component own topics
+        self.received_messages = 0
+        self.received_bytes = 0
 
         self._asyncio_event = dict()
 
-    async def _async_update(self, mqttmsg: mqtt.models.ReceiveMessage):
-        topic = mqttmsg.topic.removeprefix(self.base_topic).strip("/")
+        # Values derived from the attributes (see cached())
+        self._cache = dict()
+
+    @callback
+    def _async_update(self, mqttmsg: mqtt.models.ReceiveMessage):
+        if self.HAS_CHILDREN:
+            topic = mqttmsg.topic[self._topic_offset :]
+
+            if topic and topic[0] != "$" and "/" not in topic:
+                return
+
+        self.received_messages += 1
+        self.received_bytes += len(mqttmsg.payload)
+
+        # Processed (in batches) by the ingest queue
+        if self._ingest_queue:
+            self._ingest_queue.put(self, mqttmsg)
+        else:
+            self._async_ingest_timed(mqttmsg)
+
+    @callback
+    def _async_ingest_timed(self, mqttmsg: mqtt.models.ReceiveMessage):
+        """Ingest the message, measuring the callbacks (eg. entities) time."""
+        start = time.perf_counter()
+        self._async_ingest(mqttmsg)
+        self.ingest_time.observe(time.perf_counter() - start)
+
+    @callback
+    def _async_ingest(self, mqttmsg: mqtt.models.ReceiveMessage):
+        # Topics are always under the base_topic (ie. "{base_topic}/{topic}")
+        topic = mqttmsg.topic[self._topic_offset :]
 
         if topic == "":
             self.topic_dict.value = mqttmsg.payload
         else:
             self.topic_dict[topic] = mqttmsg.payload
 
-    async def _async_update_topic_dict(self, topic, value):
-        self._call_subscribers(self, topic, value)
+    @callback
+    def _async_update_topic_dict(self, topic, value):
+        # An attribute (ie. not the component value) is changed
+        if topic != "" and self._cache:
+            self._cache.clear()
+
+        self._call_subscribers(topic, self, topic, value)
         # raise NotImplementedError()
 
+    def cached(self, fn: Callable[[HomieBase], Any]) -> Any:
+        """Return fn(self) computed once until an attribute (eg. '$name',
+        '$stats/uptime') of the component changes.
+
+        note: fn must depend only on the component topics (not on nodes/properties)"""
+        try:
+            return self._cache[fn]
+        except KeyError:
+            value = self._cache[fn] = fn(self)
+            return value
+
+    async def _async_setup_children(self, children: list[HomieBase]):
+        """Setup the children (ie. nodes, properties) concurrently, bounded by the
+        setup semaphore shared by all the devices."""
+
+        # Router registration doesn't wait anything (no need of concurrency)
+        if self._router:
+            for child in children:
+                await child.async_setup()
+            return
+
+        async def async_setup(child: HomieBase):
+            if self._setup_semaphore is None:
+                return await child.async_setup()
+
+            async with self._setup_semaphore:
+                await child.async_setup()
+
+        await asyncio.gather(*(async_setup(child) for child in children))
+
+    def snapshot(self) -> list[tuple[str, Any]]:
+        """Return the (topic, value) of the attributes (ie. '$' topics) of the
+        component and its children, see TopicDict.dump()."""
+        return [
+            (topic, value)
+            for topic, value in self.topic_dict.dump(SNAPSHOT_EXCLUDE_TOPICS)
+            if "$" in topic
+        ]
+
+    @callback
+    def restore(self, records: Iterable[tuple[str, Any]]) -> int:
+        """Bulk load a snapshot (see snapshot()), return the restored topics.
+
+        The children are created (and restored) as on '$nodes', '$properties'
+        and the live messages reconcile the restored values."""
+        restored = self.topic_dict.load(records)
+        self._async_restored()
+        return restored
+
+    @callback
+    def _async_restored(self):
+        """Handle the restored attributes (ie. not notified by the topic_dict)."""
+        self._cache.clear()
+
+    def _restore_child(self, child: HomieBase):
+        # Restored sub-tree adopted by the child topic_dict (see TopicDict.set())
+        if len(child.topic_dict):
+            child._async_restored()
+
+    def _topic_to_parent(self, topic: str) -> str:
+        """Return the topic relative to the parent component."""
+        return f"{self.id}/{topic}" if topic else self.id
+
     def _event_fire(self, name):
         self._asyncio_event.setdefault(name, asyncio.Event()).set()
 
+    def _event_is_set(self, name) -> bool:
+        return (event := self._asyncio_event.get(name)) is not None and event.is_set()
+
     async def _event_wait(self, name, timeout=10):
         event = self._asyncio_event.setdefault(name, asyncio.Event())
 
@@ -70,46 +232,103 @@ class HomieBase(Observable):
     def t(self):
         return self.topic_dict
 
+    @property
+    def suppressed_updates(self) -> int:
+        """Return the number of received values not notified because unchanged."""
+        return self.topic_dict.suppressed_updates
+
+    @property
+    def filtered_updates(self) -> int:
+        """Return the number of received values discarded by the topics filter."""
+        return self.topic_dict.filtered_updates
+
+    def counters(self) -> dict:
+        """Return the ingestion counters of the component own topics."""
+        return {
+            "messages": self.received_messages,
+            "bytes": self.received_bytes,
+            "filtered": self.filtered_updates,
+            "suppressed": self.suppressed_updates,
+        }
+
 
 class HomieDevice(HomieBase):
     # A definition of a Homie Device
+    SUB_TOPICS = {
+        "base": "+",
+        "stats": "$stats/#",
+        "fw": "$fw/#",
+        "implementation": "$implementation/#",
+    }
+    HAS_CHILDREN = True
+
     def __init__(
         self,
         hass: HomeAssistant,
         base_topic: str,
         qos: int,
         async_on_ready: Callable | None = None,
+        router: HomieRouter | None = None,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        setup_semaphore: asyncio.Semaphore | None = None,
+        ingest_queue: HomieIngestQueue | None = None,
+        async_on_update: Callable | None = None,
     ):
-        super().__init__(hass, base_topic, qos, async_on_ready=async_on_ready)
+        super().__init__(
+            hass,
+            base_topic,
+            qos,
+            async_on_ready=async_on_ready,
+            router=router,
+            setup_semaphore=setup_semaphore,
+            ingest_queue=ingest_queue,
+            ingest_time=Histogram(CALLBACK_BUCKETS),
+        )
 
         self.nodes: dict[str, HomieNode] = dict()
 
         self.topic_dict.add_include_topic("^\$")
+        self.topic_dict.add_index(*PROPERTY_INDEXED_ATTRS)
 
         self._ready = False
+        self._ready_timeout = ready_timeout
         self._sub_state = None
 
-    async def async_setup(self):
+        # Properties added/removed after the nodes init (see _async_properties_changed())
+        self._async_on_update = async_on_update
 
-        # Topics (and callback) to subscribe
-        sub_topics = {
-            "base": {"topic": f"{self.base_topic}/+"},
-            "stats": {"topic": f"{self.base_topic}/$stats/#"},
-            "fw": {"topic": f"{self.base_topic}/$fw/#"},
-            "implementation": {"topic": f"{self.base_topic}/$implementation/#"},
-            # "nodes": {
-            #     "topic": f"{self.base_topic}/+/$properties",
-            #     "msg_callback": _async_update_nodes,
-            # },
-        }
+        # Counters of the removed nodes and properties (ie. metrics() never decrease)
+        self._removed_counters = dict.fromkeys(self.counters(), 0)
 
-        sub_base = {
-            "msg_callback": self._async_update,
-            "qos": self._qos,
-        }
+        # '$nodes' reconciles one at a time (ie. not removing nodes still in setup)
+        self._reconcile_lock = asyncio.Lock()
+
+        # Seconds from setup to ready (ie. time-to-ready)
+        self.ready_duration: float | None = None
+        # Seconds from setup to the initial nodes/properties setup completed
+        self.setup_duration: float | None = None
+
+        # Properties set => state echo round-trip (see HomieCommand)
+        self.command_latency = Histogram()
+        self.command_timeouts = 0
+        self._setup_time: float | None = None
 
+    async def async_setup(self):
+        self._setup_time = time.monotonic()
+
+        # Messages dispatched by the router (ie. single wildcard subscription)
+        if self._router:
+            self._router.register(self)
+            return
+
+        # Topics (and callback) to subscribe
         sub_topics = {
-            name: {**sub_base, **value} for (name, value) in sub_topics.items()
+            name: {
+                "topic": f"{self.base_topic}/{sub_topic}",
+                "msg_callback": self._async_update,
+                "qos": self._qos,
+            }
+            for (name, sub_topic) in self.SUB_TOPICS.items()
         }
 
         self._sub_state = subscription.async_prepare_subscribe_topics(
@@ -119,35 +338,221 @@ class HomieDevice(HomieBase):
         await subscription.async_subscribe_topics(self._hass, self._sub_state)
 
     async def async_unsubscribe_topics(self):
+        """Unsubscribe the device, its nodes and their properties."""
+        for node in self.nodes.values():
+            await node.async_unsubscribe_topics()
+
+        if self._ingest_queue:
+            self._ingest_queue.discard(self)
+
+        if self._router:
+            self._router.unregister(self, discard_pending=True)
+            return
+
         self._sub_state = await subscription.async_unsubscribe_topics(
             self._hass, self._sub_state
         )
-        # TODO: add nodes unsubscribe
 
-    async def _async_update_topic_dict(self, topic, value):
-        await super()._async_update_topic_dict(topic, value)
+    async def async_teardown(self) -> dict[str, int]:
+        """Unsubscribe the whole device and drop its observers (eg. entities) and
+        topics tree. Return the reclaimed objects by type.
+
+        note: the device can't be used anymore (a new one must be created)"""
+        await self.async_unsubscribe_topics()
+
+        components: list[HomieBase] = [self]
+        reclaimed = dict.fromkeys(("nodes", "properties", "topics", "observers"), 0)
+
+        for node in self.nodes.values():
+            components.append(node)
+            components.extend(node.properties.values())
+            reclaimed["nodes"] += 1
+            reclaimed["properties"] += len(node.properties)
+
+        # Topics of the whole tree (ie. nodes and properties included)
+        stack = list(self.topic_dict.values())
+
+        while stack:
+            topic_node = stack.pop()
+            reclaimed["topics"] += 1
+            stack.extend(topic_node.values())
 
+        for component in components:
+            reclaimed["observers"] += component.unsubscribe_all()
+            component.topic_dict.unsubscribe_all()
+            component._cache.clear()
+
+        for node in self.nodes.values():
+            node.properties.clear()
+
+        self.nodes.clear()
+        self.topic_dict = TopicDict()
+
+        return reclaimed
+
+    @callback
+    def _async_update_topic_dict(self, topic, value):
+        super()._async_update_topic_dict(topic, value)
+
+        # Only the topics that need to wait something are handled in a task
         if topic == "$state" and value == "ready" and self._ready is False:
             self._ready = True
-            # Wait nodes and sub-properties are init
-            await self._event_wait("nodes-init")
-            await asyncio.gather(*(node.async_ready() for node in self.nodes.values()))
-            # delay to allow fill the subscribed topics
-            await asyncio.sleep(6)
-
-            self._event_fire("ready")
-            if self._async_on_ready:
-                await self._async_on_ready(self)
+            self._hass.async_create_task(self._async_state_ready())
 
         elif topic == "$nodes":
-            for node_id in value.split(","):
+            self._hass.async_create_task(self._async_update_nodes(value))
+
+    @callback
+    def _async_restored(self):
+        super()._async_restored()
+
+        if nodes := self.topic_dict.get("$nodes"):
+            self._hass.async_create_task(self._async_update_nodes(nodes))
+
+    async def _async_state_ready(self):
+        # Wait nodes and sub-properties are received (with an upper bound)
+        try:
+            await asyncio.wait_for(self.async_nodes_ready(), self._ready_timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "Device '%s' not completely received in %ss, not ready nodes: %s",
+                self.id,
+                self._ready_timeout,
+                [node.id for node in self.nodes.values() if not node.is_ready],
+            )
+
+        self.ready_duration = time.monotonic() - self._setup_time
+        _LOGGER.debug("Device '%s' ready in %.3fs", self.id, self.ready_duration)
+
+        self._event_fire("ready")
+        if self._async_on_ready:
+            await self._async_on_ready(self)
+
+    async def async_nodes_ready(self):
+        """Wait the nodes and their properties are received (or restored)."""
+        await self._event_wait("nodes-init", timeout=None)
+        await asyncio.gather(
+            *(node._event_wait("ready", timeout=None) for node in self.nodes.values())
+        )
+
+    async def _async_update_nodes(self, nodes: str):
+        node_ids = list(filter(None, nodes.split(",")))
+        new_nodes = list()
+        removed_properties = list()
+
+        async with self._reconcile_lock:
+            # Nodes not announced anymore (eg. after a firmware update)
+            for node in [
+                node for node in self.nodes.values() if node.id not in node_ids
+            ]:
+                removed_properties.extend(await node.async_remove())
+
+            for node_id in node_ids:
                 # TODO: add nodes restiction list
                 if node_id not in self.nodes:
                     node = HomieNode(self, self.base_topic + "/" + node_id)
                     self.nodes[node_id] = node
-                    await node.async_setup()
+                    self._restore_child(node)
+                    new_nodes.append(node)
+
+            await self._async_setup_children(new_nodes)
+
+        self._event_fire("nodes-init")
+        self._setup_done()
 
-            self._event_fire("nodes-init")
+        if removed_properties:
+            await self._async_properties_changed([], removed_properties)
+
+    async def _async_properties_changed(
+        self, added: list[HomieProperty], removed: list[HomieProperty]
+    ):
+        """Call async_on_update with the properties added (once received, or after
+        the ready timeout as the device ready) and removed after the nodes init
+        (ie. only the delta to discover/remove)."""
+        if self._async_on_update is None:
+            return
+
+        if added:
+            await asyncio.gather(
+                *(
+                    property._event_wait("ready", self._ready_timeout)
+                    for property in added
+                )
+            )
+
+            if not_ready := [
+                property.id for property in added if not property.is_ready
+            ]:
+                _LOGGER.warning(
+                    "Device '%s' properties added but not received in %ss: %s",
+                    self.id,
+                    self._ready_timeout,
+                    not_ready,
+                )
+
+            # Still announced, even if not received (ie. discovered as on ready)
+            added = [
+                property
+                for property in added
+                if property.node.properties.get(property.id) is property
+            ]
+
+        if added or removed:
+            await self._async_on_update(self, added, removed)
+
+    def _setup_done(self):
+        """Update setup_duration on a nodes/properties setup completed, until
+        the initial ones are all done (ie. not on the later '$nodes'/'$properties')."""
+        if self.setup_duration is not None or self._setup_time is None:
+            return
+
+        if self._event_is_set("nodes-init") and all(
+            node._event_is_set("properties-init") for node in self.nodes.values()
+        ):
+            self.setup_duration = time.monotonic() - self._setup_time
+
+    def metrics(self) -> dict:
+        """Return the ingestion metrics of the whole device (nodes and properties
+        included), the setup/ready times and the commands round-trip."""
+        totals = self.counters()
+
+        for key, value in self._removed_counters.items():
+            totals[key] += value
+
+        for node in self.nodes.values():
+            for component in (node, *node.properties.values()):
+                for key, value in component.counters().items():
+                    totals[key] += value
+
+        return {
+            **totals,
+            "ingest_time": self.ingest_time.as_dict(),
+            "setup_duration": self.setup_duration,
+            "ready_duration": self.ready_duration,
+            "command_latency": self.command_latency.as_dict(),
+            "command_timeouts": self.command_timeouts,
+        }
+
+    @callback
+    def _async_add_removed_counters(self, component: HomieBase):
+        """Keep the counters of a removed node or property in the totals."""
+        for key, value in component.counters().items():
+            self._removed_counters[key] += value
+
+    def query_properties(
+        self, where: dict[str, Any] | None = None
+    ) -> Iterator[HomieProperty]:
+        """Yield the properties (of all the nodes) with the attributes matching the
+        where predicates (eg. {'$datatype': 'float', '$settable': TRUE}).
+
+        note: O(matches) with a value on an indexed attribute (PROPERTY_INDEXED_ATTRS)"""
+        for topic, _ in self.topic_dict.query("+/+", where):
+            node_id, property_id = topic.split("/")
+
+            if (node := self.nodes.get(node_id)) and (
+                homie_property := node.properties.get(property_id)
+            ):
+                yield homie_property
 
     def has_node(self, node_id: str):
         """Check presence of Node in the device."""
@@ -172,8 +577,19 @@ class HomieDevice(HomieBase):
 
 class HomieNode(HomieBase):
     # A definition of a Homie Node
+    SUB_TOPICS = {"base": "+"}
+    HAS_CHILDREN = True
+
     def __init__(self, device: HomieDevice, base_topic: str):
-        super().__init__(device._hass, base_topic, device._qos)
+        super().__init__(
+            device._hass,
+            base_topic,
+            device._qos,
+            router=device._router,
+            setup_semaphore=device._setup_semaphore,
+            ingest_queue=device._ingest_queue,
+            ingest_time=device.ingest_time,
+        )
 
         self.device = device
         self.properties: dict[str, HomieProperty] = dict()
@@ -182,34 +598,133 @@ class HomieNode(HomieBase):
 
         self.topic_dict.add_include_topic("^\$")
 
+        # All the properties are received (see _async_property_ready())
+        self.is_ready = False
+
+        # Added to an initialized device: its properties are a device change
+        self._is_added = device._event_is_set("nodes-init")
+
+        # '$properties' reconciles and the removal one at a time (see HomieDevice)
+        self._reconcile_lock = asyncio.Lock()
+
+        self._async_unsubscribe_topics: Callable | None = None
+
     async def async_setup(self):
+        if self._router:
+            self._router.register(self)
+            self._async_unsubscribe_topics = functools.partial(
+                self._router.unregister, self
+            )
+            return
+
         self._async_unsubscribe_topics = await mqtt.async_subscribe(
-            self._hass, f"{self.base_topic}/+", self._async_update, self._qos
+            self._hass,
+            f"{self.base_topic}/{self.SUB_TOPICS['base']}",
+            self._async_update,
+            self._qos,
         )
 
     async def async_unsubscribe_topics(self):
-        self._async_unsubscribe_topics()
+        """Unsubscribe the node and its properties."""
+        for property in self.properties.values():
+            await property.async_unsubscribe_topics()
 
-        # TODO: add properties unsubscribe
+        if self._ingest_queue:
+            self._ingest_queue.discard(self)
 
-    async def _async_update_topic_dict(self, topic, value):
-        await super()._async_update_topic_dict(topic, value)
+        if self._async_unsubscribe_topics:
+            self._async_unsubscribe_topics()
+            self._async_unsubscribe_topics = None
+
+    @callback
+    def _async_update_topic_dict(self, topic, value):
+        super()._async_update_topic_dict(topic, value)
 
-        # notes: can be removed this method and call node.async_setup() by create_task
         if topic == "$properties":
-            for property_id in value.split(","):
+            self._hass.async_create_task(self._async_update_properties(value))
+
+    @callback
+    def _async_restored(self):
+        super()._async_restored()
+
+        if properties := self.topic_dict.get("$properties"):
+            self._hass.async_create_task(self._async_update_properties(properties))
+
+    async def _async_update_properties(self, properties: str):
+        property_ids = list(filter(None, properties.split(",")))
+        new_properties = list()
+
+        async with self._reconcile_lock:
+            # Removed in the meanwhile (ie. not in the device '$nodes' anymore)
+            if self.device.nodes.get(self.id) is not self:
+                return
+
+            # Properties of an added node or re-announced (ie. not the initial ones)
+            is_change = self._is_added or self._event_is_set("properties-init")
+
+            # Properties not announced anymore (eg. after a firmware update)
+            removed_properties = [
+                property
+                for property in self.properties.values()
+                if property.id not in property_ids
+            ]
+
+            for property in removed_properties:
+                await property.async_remove()
+
+            for property_id in property_ids:
                 if property_id not in self.properties:
                     # TODO: add properties restiction list
                     property = HomieProperty(self, self.base_topic + "/" + property_id)
                     self.properties[property_id] = property
-                    await property.async_setup()
+                    self._restore_child(property)
+                    new_properties.append(property)
+
+            await self._async_setup_children(new_properties)
 
-            self._event_fire("properties-init")
+        self._event_fire("properties-init")
+        self.device._setup_done()
+        self._async_property_ready()
+
+        if is_change and (new_properties or removed_properties):
+            await self.device._async_properties_changed(
+                new_properties, removed_properties
+            )
+
+    async def async_remove(self) -> list[HomieProperty]:
+        """Unsubscribe the node (and its properties) and detach it from the device
+        (ie. not in '$nodes' anymore). Return the removed properties."""
+        # After a '$properties' reconcile in progress (ie. its setup completed)
+        async with self._reconcile_lock:
+            properties = list(self.properties.values())
+
+            for property in properties:
+                await property.async_remove()
+
+            await self.async_unsubscribe_topics()
+            self.unsubscribe_all()
+            self.topic_dict.unsubscribe_all()
+
+            self.device.nodes.pop(self.id, None)
+            self.device.topic_dict._del(self.id)
+            self.device._async_add_removed_counters(self)
+
+        return properties
+
+    @callback
+    def _async_property_ready(self):
+        """Fire ready when all the (announced) properties are complete."""
+        if (
+            not self.is_ready
+            and self._event_is_set("properties-init")
+            and all(property.is_ready for property in self.properties.values())
+        ):
+            self.is_ready = True
             self._event_fire("ready")
 
-    def _call_subscribers(self, *attrs, **kwargs):
-        super()._call_subscribers(*attrs, **kwargs)
-        self.device._call_subscribers(*attrs, **kwargs)
+    def _call_subscribers(self, topic, *attrs, **kwargs):
+        super()._call_subscribers(topic, *attrs, **kwargs)
+        self.device._call_subscribers(self._topic_to_parent(topic), *attrs, **kwargs)
 
     def has_property(self, property_id: str):
         """Return a specific Property for the node."""
@@ -234,29 +749,181 @@ class HomieNode(HomieBase):
 
 class HomieProperty(HomieBase):
     # A definition of a Homie Property
+    SUB_TOPICS = {"base": "#"}
+
     def __init__(self, node: HomieNode, base_topic: str):
-        super().__init__(node._hass, base_topic, node._qos)
+        super().__init__(
+            node._hass,
+            base_topic,
+            node._qos,
+            router=node._router,
+            setup_semaphore=node._setup_semaphore,
+            ingest_queue=node._ingest_queue,
+            ingest_time=node.ingest_time,
+        )
 
         self.node = node
         self.node.topic_dict.set(self.id, self.topic_dict, force=True)
 
+        # The required attributes are received (and the optional ones or the grace)
+        self.is_ready = False
+        self._grace_handle: asyncio.TimerHandle | None = None
+        self._grace_elapsed = False
+
+        # Value decoded by datatype (see typed_value)
+        self._typed_value = _UNDECODED
+
+        # Outbound sets (see command)
+        self._command: HomieCommand | None = None
+
+        self._async_unsubscribe_topics: Callable | None = None
+
     async def async_setup(self):
-        self.async_unsubscribe_topics = await mqtt.async_subscribe(
-            self._hass, f"{self.base_topic}/#", self._async_update, self._qos
+        if self._router:
+            self._router.register(self)
+            self._async_unsubscribe_topics = functools.partial(
+                self._router.unregister, self
+            )
+            return
+
+        self._async_unsubscribe_topics = await mqtt.async_subscribe(
+            self._hass,
+            f"{self.base_topic}/{self.SUB_TOPICS['base']}",
+            self._async_update,
+            self._qos,
+        )
+
+    async def async_unsubscribe_topics(self):
+        if self._command is not None:
+            self._command.async_cancel()
+
+        if self._grace_handle is not None:
+            self._grace_handle.cancel()
+            self._grace_handle = None
+
+        if self._ingest_queue:
+            self._ingest_queue.discard(self)
+
+        if self._async_unsubscribe_topics:
+            self._async_unsubscribe_topics()
+            self._async_unsubscribe_topics = None
+
+    def unsubscribe_all(self) -> int:
+        """Remove all the callbacks, the command ones included, return how many."""
+        count = super().unsubscribe_all()
+
+        if self._command is not None:
+            count += self._command.unsubscribe_all()
+
+        return count
+
+    async def async_remove(self):
+        """Unsubscribe the property and detach it from the node (ie. not in
+        '$properties' anymore), its observers (eg. entities) are dropped."""
+        await self.async_unsubscribe_topics()
+        self.unsubscribe_all()
+        self.topic_dict.unsubscribe_all()
+
+        self.node.properties.pop(self.id, None)
+        self.node.topic_dict._del(self.id)
+        self.node.device._async_add_removed_counters(self)
+
+    def _call_subscribers(self, topic, *attrs, **kwargs):
+        super()._call_subscribers(topic, *attrs, **kwargs)
+        self.node._call_subscribers(self._topic_to_parent(topic), *attrs, **kwargs)
+
+    @callback
+    def _async_update_topic_dict(self, topic, value):
+        # Before the subscribers (ie. entities) read it
+        if topic == "" or topic == "$datatype":
+            self._typed_value = _UNDECODED
+
+        super()._async_update_topic_dict(topic, value)
+
+        if topic.startswith("$"):
+            self._async_check_ready()
+
+    @callback
+    def _async_restored(self):
+        super()._async_restored()
+        self._typed_value = _UNDECODED
+        self._async_check_ready()
+
+    @callback
+    def _async_check_ready(self):
+        if self.is_ready or not self._has_required_attrs():
+            return
+
+        if not self._grace_elapsed and any(
+            attr not in self.topic_dict for attr in PROPERTY_OPTIONAL_ATTRS
+        ):
+            if self._grace_handle is None:
+                self._grace_handle = asyncio.get_running_loop().call_later(
+                    PROPERTY_OPTIONAL_GRACE, self._async_grace_elapsed
+                )
+            return
+
+        if self._grace_handle is not None:
+            self._grace_handle.cancel()
+            self._grace_handle = None
+
+        self.is_ready = True
+        self._event_fire("ready")
+        self.node._async_property_ready()
+
+    @callback
+    def _async_grace_elapsed(self):
+        self._grace_handle = None
+        self._grace_elapsed = True
+        self._async_check_ready()
+
+    def _has_required_attrs(self) -> bool:
+        if any(attr not in self.topic_dict for attr in PROPERTY_REQUIRED_ATTRS):
+            return False
+
+        return (
+            self.datatype not in PROPERTY_REQUIRED_FORMAT_DATATYPES
+            or "$format" in self.topic_dict
         )
 
-    def _call_subscribers(self, *attrs, **kwargs):
-        super()._call_subscribers(*attrs, **kwargs)
-        self.node._call_subscribers(*attrs, **kwargs)
+    async def async_ready(self):
+        """Wait since the property is ready."""
+        return await self._event_wait("ready")
 
-    # async def _async_update_topic_dict(self, topic, value):
-    #     pass
+    @callback
+    def _async_ingest(self, mqttmsg: mqtt.models.ReceiveMessage):
+        # The property state (ie. not an attribute) from the device, before the
+        # subscribers are notified (ie. the assumed value is already dropped)
+        if self._command is not None and len(mqttmsg.topic) < self._topic_offset:
+            self._command._async_on_state(mqttmsg.payload)
 
-    async def async_set(self, value: str):
-        """Set the state of the Property."""
+        super()._async_ingest(mqttmsg)
+
+    @property
+    def command(self) -> HomieCommand:
+        """Return the outbound sets pipeline (created on first use)."""
+        if self._command is None:
+            self._command = HomieCommand(self)
+
+        return self._command
+
+    @property
+    def assumed_value(self) -> Any:
+        """Return the latest set not echoed by the device yet (decoded), if any."""
+        if self._command is None or self._command.assumed is None:
+            return None
+
+        return decode_value(self.datatype, self._command.assumed)
+
+    async def async_set(
+        self, value: Any, window: float | None = None, timeout: float | None = None
+    ):
+        """Set the state of the Property (coalesced, see HomieCommand).
+
+        window and timeout of the set (eg. entity config), the command ones if None."""
         if self.settable:
-            await mqtt.async_publish(
-                self._hass, f"{self.base_topic}/set", value, self._qos, retain=True
+            await self.command.async_set(
+                encode_value(self.datatype, value), window, timeout
             )
 
     @property
@@ -267,6 +934,19 @@ class HomieProperty(HomieBase):
     def value(self, value):
         self.topic_dict.value = value
 
+    @property
+    def typed_value(self) -> Any:
+        """Return the value converted by datatype (decoded once for each value)."""
+        if self._typed_value is _UNDECODED:
+            self._typed_value = decode_value(self.datatype, self.value)
+
+        return self._typed_value
+
+    @property
+    def format(self) -> Any:
+        """Return the parsed format (see datatype.decode_format())."""
+        return self.cached(_property_format)
+
     @property
     def settable(self):
         """Return if the Property is settable."""
@@ -277,3 +957,7 @@ class HomieProperty(HomieBase):
     def datatype(self):
         """Return Property type."""
         return self.topic_dict.get("$datatype")
+
+
+def _property_format(homie_property: HomieProperty) -> Any:
+    return decode_format(homie_property.datatype, homie_property.t["$format"])
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import re
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from . import TRUE, FALSE
+
+_LOGGER = logging.getLogger(__name__)
+
+INTEGER = "integer"
+FLOAT = "float"
+PERCENT = "percent"
+BOOLEAN = "boolean"
+STRING = "string"
+ENUM = "enum"
+COLOR = "color"
+DATETIME = "datetime"
+DURATION = "duration"
+
+NUMERIC_DATATYPES = (INTEGER, FLOAT, PERCENT)
+
+# ISO 8601 duration (eg. 'PT12H5M46S')
+DURATION_REGEX = re.compile(
+    r"^P(?:(?P<days>\d+(?:\.\d+)?)D)?"
+    r"(?:T(?:(?P<hours>\d+(?:\.\d+)?)H)?(?:(?P<minutes>\d+(?:\.\d+)?)M)?"
+    r"(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$"
+)
+
+
+def _to_int(payload: Any) -> int:
+    try:
+        return int(payload)
+    except ValueError:
+        # Integral float notation only (eg. '21.0', not truncating '21.7')
+        if not (number := float(payload)).is_integer():
+            raise ValueError(f"Not an integer: {payload}") from None
+
+        return int(number)
+
+
+def _to_datetime(payload: str) -> datetime:
+    # fromisoformat() doesn't support 'Z' before python 3.11
+    return datetime.fromisoformat(payload.replace("Z", "+00:00"))
+
+
+def _to_timedelta(payload: str) -> timedelta:
+    if (match := DURATION_REGEX.match(payload)) is None:
+        raise ValueError(f"Invalid ISO 8601 duration: {payload}")
+
+    return timedelta(
+        **{unit: float(value) for unit, value in match.groupdict().items() if value}
+    )
+
+
+def _to_color(payload: str) -> tuple[int, ...]:
+    return tuple(_to_int(channel) for channel in payload.split(","))
+
+
+VALUE_DECODERS: dict[str, Callable[[Any], Any]] = {
+    INTEGER: _to_int,
+    FLOAT: float,
+    PERCENT: float,
+    BOOLEAN: lambda payload: payload == TRUE,
+    COLOR: _to_color,
+    DATETIME: _to_datetime,
+    DURATION: _to_timedelta,
+}
+
+
+def decode_value(datatype: str | None, payload: Any) -> Any:
+    """Return the payload converted by the property datatype.
+
+    note: None on a payload not valid for the datatype, the payload as is for the
+    datatypes without conversion (ie. string, enum or unknown)"""
+    if payload is None or (decoder := VALUE_DECODERS.get(datatype)) is None:
+        return payload
+
+    try:
+        return decoder(payload)
+    except (ValueError, TypeError, OverflowError):
+        _LOGGER.debug("Payload '%s' not valid for datatype %s", payload, datatype)
+        return None
+
+
+def encode_value(datatype: str | None, value: Any) -> str:
+    """Return the payload of a value (eg. from HA) for the property datatype."""
+    if isinstance(value, bool):
+        return TRUE if value else FALSE
+
+    if datatype == INTEGER and isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return str(value)
+
+
+def decode_format(datatype: str | None, payload: str | None) -> Any:
+    """Return the property format parsed by datatype.
+
+    numeric: (min, max[, step]), enum: tuple of values, color: 'rgb' or 'hsv'"""
+    if payload is None:
+        return None
+
+    if datatype in NUMERIC_DATATYPES:
+        number = _to_int if datatype == INTEGER else float
+
+        try:
+            return tuple(number(bound) for bound in payload.split(":"))
+        except (ValueError, OverflowError):
+            _LOGGER.debug("Format '%s' not valid for datatype %s", payload, datatype)
+            return None
+
+    if datatype == ENUM:
+        return tuple(payload.split(","))
+
+    return payload
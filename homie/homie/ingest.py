@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.components import mqtt
+
+if TYPE_CHECKING:
+    from .component import HomieBase
+
+_LOGGER = logging.getLogger(__name__)
+
+# Max messages waiting to be processed (then processed inline)
+DEFAULT_MAX_SIZE = 10000
+# Max messages processed in one event loop iteration
+DEFAULT_BATCH_SIZE = 500
+
+
+class HomieIngestQueue(object):
+    """Buffer the received messages between the MQTT callbacks and the components
+    tree (ie. TopicDict), shared by all the devices.
+
+    Messages are processed in batches (one per event loop iteration) and the writes
+    on the same topic still waiting are collapsed (ie. only the last is processed).
+    When full the whole queue is processed inline (ie. backpressure on the MQTT
+    callbacks) instead of growing without limits."""
+
+    def __init__(
+        self, max_size: int = DEFAULT_MAX_SIZE, batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        self._max_size = max_size
+        self._batch_size = batch_size
+
+        # (component, topic) => message, in arrival order
+        self._queue: dict[tuple[HomieBase, str], mqtt.models.ReceiveMessage] = dict()
+        self._drain_scheduled = False
+
+        # Stats
+        self.processed = 0
+        self.collapsed = 0
+        self.dropped = 0
+        self.overflow_flushes = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of messages waiting."""
+        return len(self._queue)
+
+    @callback
+    def put(self, component: HomieBase, mqttmsg: mqtt.models.ReceiveMessage):
+        key = (component, mqttmsg.topic)
+
+        if key in self._queue:
+            self.collapsed += 1
+            self._queue[key] = mqttmsg
+            return
+
+        if len(self._queue) >= self._max_size:
+            self.overflow_flushes += 1
+            _LOGGER.debug("Ingest queue full (%s), processing inline", self._max_size)
+            self._async_process(len(self._queue))
+
+        self._queue[key] = mqttmsg
+        self.max_depth = max(self.max_depth, len(self._queue))
+
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            asyncio.get_running_loop().call_soon(self._async_drain)
+
+    @callback
+    def discard(self, component: HomieBase):
+        """Drop the waiting messages of a component (eg. on unsubscribe)."""
+        for key in [key for key in self._queue if key[0] is component]:
+            del self._queue[key]
+            self.dropped += 1
+
+    @callback
+    def _async_drain(self):
+        self._drain_scheduled = False
+        self._async_process(self._batch_size)
+
+        # Next batch in the next event loop iteration
+        if self._queue and not self._drain_scheduled:
+            self._drain_scheduled = True
+            asyncio.get_running_loop().call_soon(self._async_drain)
+
+    @callback
+    def _async_process(self, count: int):
+        while self._queue and count > 0:
+            key = next(iter(self._queue))
+            mqttmsg = self._queue.pop(key)
+            count -= 1
+
+            self.processed += 1
+            key[0]._async_ingest_timed(mqttmsg)
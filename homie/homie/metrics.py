@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import bisect
+
+# Seconds upper bounds of the latency buckets (plus +inf)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Seconds upper bounds of the callback execution time buckets (plus +inf)
+CALLBACK_BUCKETS = (0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+
+
+class Histogram(object):
+    """Fixed buckets histogram (eg. latencies) with count, sum and max."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # The last one is the +inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max: float | None = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def avg(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.avg,
+            "max": self.max,
+            "buckets": {
+                f"le_{bound}": count for bound, count in zip(self.buckets, self.counts)
+            }
+            | {"le_inf": self.counts[-1]},
+        }
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import callback
+
+from .component import HomieDevice, HomieProperty
+
+# Default seconds to coalesce the state writes
+DEFAULT_STATE_WRITE_WINDOW = 0.25
+
+
+class HomiePropertyObserver(object):
+    """Observe a HomieProperty (and its device attributes) as an entity does and
+    call async_write_ha_state() on the changes: immediately on the property value,
+    coalesced in _state_write_window seconds on the attributes (eg. device stats).
+
+    Used by the HA entities (see entity_base.HomieEntity) and the benchmarks: the
+    subclass sets _homie_property and _homie_device, and has async_write_ha_state()."""
+
+    _state_write_window = DEFAULT_STATE_WRITE_WINDOW
+    _state_write_handle: asyncio.TimerHandle | None = None
+
+    # Show the assumed value (ie. the last set not echoed yet, see HomieCommand)
+    _optimistic = False
+
+    _homie_property: HomieProperty
+    _homie_device: HomieDevice
+
+    @callback
+    def _async_subscribe_homie(self):
+        # Only the device own topics (ie. not the ones of nodes and properties)
+        # note: weak, a removed entity is not kept alive by the Homie components
+        for topic_filter in HomieDevice.SUB_TOPICS.values():
+            self._homie_device.subscribe(
+                self._async_on_device_change, topic_filter, weak=True
+            )
+
+        self._homie_property.subscribe(self._async_on_property_change, weak=True)
+
+        if self._optimistic:
+            self._homie_property.command.subscribe(
+                self._async_on_assumed_change, weak=True
+            )
+
+    @callback
+    def _async_unsubscribe_homie(self):
+        for topic_filter in HomieDevice.SUB_TOPICS.values():
+            self._homie_device.unsubscribe(self._async_on_device_change, topic_filter)
+
+        self._homie_property.unsubscribe(self._async_on_property_change)
+
+        if self._optimistic:
+            self._homie_property.command.unsubscribe(self._async_on_assumed_change)
+
+        self._async_cancel_state_write()
+
+    @callback
+    def _async_cancel_state_write(self):
+        if self._state_write_handle is not None:
+            self._state_write_handle.cancel()
+            self._state_write_handle = None
+
+    @callback
+    def _async_schedule_write_ha_state(self, immediate: bool = False):
+        """Write the state coalescing the changes in the _state_write_window."""
+        if immediate or not self._state_write_window:
+            self._async_cancel_state_write()
+            self.async_write_ha_state()
+
+        # A write is already scheduled (and will include this change)
+        elif self._state_write_handle is None:
+            self._state_write_handle = asyncio.get_running_loop().call_later(
+                self._state_write_window, self._async_write_scheduled
+            )
+
+    @callback
+    def _async_write_scheduled(self):
+        self._state_write_handle = None
+        self.async_write_ha_state()
+
+    @callback
+    def _async_on_device_change(self, homie_component, topic, value):
+        """Callend on device topic or childrens (ie. nodes, property) change."""
+        if isinstance(homie_component, HomieDevice):
+            self._async_schedule_write_ha_state()
+
+    @callback
+    def _async_on_property_change(self, homie_property, topic, value):
+        """Callend on property topic change."""
+        if topic != "set":
+            # The property value is written immediately (ie. responsive actuators)
+            self._async_schedule_write_ha_state(immediate=topic == "")
+
+    @callback
+    def _async_on_assumed_change(self, homie_property):
+        """Callend on the property assumed value change (only if optimistic)."""
+        self._async_schedule_write_ha_state(immediate=True)
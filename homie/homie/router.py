@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import time
+import logging
+from collections import deque
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.components import mqtt
+
+from .utils import topic_match
+
+if TYPE_CHECKING:
+    from .component import HomieBase
+
+_LOGGER = logging.getLogger(__name__)
+
+# Max retained messages kept while waiting their component
+DEFAULT_MAX_PENDING = 50000
+# Seconds a retained message waits its component (eg. not Homie topics on '+/#')
+DEFAULT_PENDING_TTL = 60
+
+
+class _RouteNode(object):
+    __slots__ = ("children", "component", "pending")
+
+    def __init__(self):
+        self.children: dict[str, _RouteNode] = dict()
+        self.component: HomieBase | None = None
+        self.pending: mqtt.models.ReceiveMessage | None = None
+
+
+class HomieRouter(object):
+    """Dispatch the messages of a single wildcard subscription (eg. 'homie/#')
+    to the Homie components (device, node, property).
+
+    Components are stored in a trie keyed on their topic levels and each message
+    is delivered to the components, along its topic path, that would have received
+    it with their own subscriptions (ie. HomieBase.SUB_TOPICS).
+
+    Retained messages that arrive before the component (eg. node attributes before
+    the device '$nodes') are kept and replayed on component registration, or
+    expired after pending_ttl seconds (ie. a component never registered)."""
+
+    def __init__(
+        self,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        pending_ttl: float = DEFAULT_PENDING_TTL,
+    ):
+        self._root = _RouteNode()
+        self._max_pending = max_pending
+        self._pending_ttl = pending_ttl
+
+        # (monotonic time, levels, message) of the pending messages, oldest first
+        self._pending_order: deque[
+            tuple[float, list[str], mqtt.models.ReceiveMessage]
+        ] = deque()
+
+        # Stats
+        self.pending = 0
+        self.dropped = 0
+        self.expired = 0
+
+    def _walk(self, levels: list[str], create: bool = False) -> _RouteNode | None:
+        route_node = self._root
+
+        for level in levels:
+            if (child := route_node.children.get(level)) is None:
+                if not create:
+                    return None
+
+                child = route_node.children[level] = _RouteNode()
+
+            route_node = child
+
+        return route_node
+
+    @callback
+    def register(self, component: HomieBase):
+        """Add a component and deliver its pending retained messages."""
+        levels = component.base_topic.split("/")
+        route_node = self._walk(levels, create=True)
+        route_node.component = component
+
+        # Collect and replay pending messages of the new component subtree
+        pending = []
+        stack = [route_node]
+
+        while stack:
+            node = stack.pop()
+
+            if node.pending is not None:
+                pending.append(node.pending)
+                node.pending = None
+                self.pending -= 1
+
+            stack.extend(node.children.values())
+
+        for mqttmsg in pending:
+            self.route(mqttmsg, min_depth=len(levels))
+
+    def unregister(self, component: HomieBase, discard_pending: bool = False):
+        """Remove a component (messages are not delivered anymore).
+
+        With discard_pending the pending messages of its subtree are dropped too
+        (eg. device teardown, after its nodes and properties)."""
+        levels = component.base_topic.split("/")
+        path = [self._root]
+
+        for level in levels:
+            if (route_node := path[-1].children.get(level)) is None:
+                return
+
+            path.append(route_node)
+
+        if route_node.component is not component:
+            return
+
+        route_node.component = None
+
+        if discard_pending:
+            stack = list(route_node.children.values())
+
+            while stack:
+                node = stack.pop()
+
+                if node.pending is not None:
+                    self.pending -= 1
+
+                stack.extend(node.children.values())
+
+            route_node.children.clear()
+
+        self._prune(path, levels)
+
+    def _prune(self, path: list[_RouteNode], levels: list[str]):
+        """Drop the levels without components, pending messages or sub-levels."""
+        for depth in range(len(levels), 0, -1):
+            node = path[depth]
+
+            if node.component is not None or node.pending is not None or node.children:
+                break
+
+            del path[depth - 1].children[levels[depth - 1]]
+
+    @callback
+    def route(self, mqttmsg: mqtt.models.ReceiveMessage, min_depth: int = 0):
+        """Deliver a message to the interested components."""
+        levels = mqttmsg.topic.split("/")
+        route_node = self._root
+        components = []
+        parent, parent_depth = None, 0
+
+        for depth, level in enumerate(levels, 1):
+            if (route_node := route_node.children.get(level)) is None:
+                break
+
+            if (component := route_node.component) is None:
+                continue
+
+            parent, parent_depth = component, depth
+
+            if depth >= min_depth and any(
+                topic_match(sub_topic, levels[depth:])
+                for sub_topic in component.SUB_TOPICS_LEVELS
+            ):
+                components.append(component)
+
+        # Message of a not (yet) registered child component (ie. not an attribute
+        # and the parent doesn't own the whole subtree).
+        # note: keep also the not retained ones when the parent is known, they
+        # are probably published during the device boot
+        if (
+            parent_depth < len(levels)
+            and not levels[parent_depth].startswith("$")
+            and (parent is None or ["#"] not in parent.SUB_TOPICS_LEVELS)
+            and (mqttmsg.retain or parent is not None)
+        ):
+            self._add_pending(levels, mqttmsg)
+
+        for component in components:
+            component._async_update(mqttmsg)
+
+        return bool(components)
+
+    def _add_pending(self, levels: list[str], mqttmsg: mqtt.models.ReceiveMessage):
+        now = time.monotonic()
+        self._expire_pending(now)
+
+        route_node = self._walk(levels, create=True)
+
+        if route_node.pending is None:
+            if self.pending >= self._max_pending:
+                self.dropped += 1
+                _LOGGER.debug("Pending messages limit reached, drop: %s", mqttmsg.topic)
+                self._prune(self._path(levels), levels)
+                return
+
+            self.pending += 1
+
+        route_node.pending = mqttmsg
+        self._pending_order.append((now, levels, mqttmsg))
+
+    def _expire_pending(self, now: float):
+        """Drop the pending messages older than pending_ttl (still not delivered)."""
+        pending_order = self._pending_order
+
+        while pending_order and now - pending_order[0][0] >= self._pending_ttl:
+            _, levels, mqttmsg = pending_order.popleft()
+            path = self._path(levels)
+
+            # Already replayed, replaced by a newer one or discarded
+            if len(path) <= len(levels) or path[-1].pending is not mqttmsg:
+                continue
+
+            path[-1].pending = None
+            self.pending -= 1
+            self.expired += 1
+            self._prune(path, levels)
+
+    def _path(self, levels: list[str]) -> list[_RouteNode]:
+        """Return the route nodes from the root along levels (up to the missing)."""
+        path = [self._root]
+
+        for level in levels:
+            if (route_node := path[-1].children.get(level)) is None:
+                break
+
+            path.append(route_node)
+
+        return path
@@ -1,52 +1,520 @@
 from __future__ import annotations
 
 import re
+import sys
+import json
 import asyncio
-from typing import Any, Callable, Union
+import weakref
+import functools
+from types import MethodType
+from typing import Any, Callable, Container, Iterable, Iterator, TextIO, Union
+
+# Max topics in the include/exclude decision cache (of each TopicDict)
+FILTERED_TOPICS_CACHE_SIZE = 1024
+# Max topics in the split cache (see topic_path())
+TOPIC_PATHS_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=TOPIC_PATHS_CACHE_SIZE)
+def topic_path(topic: str) -> tuple[str, ...]:
+    """Return the (interned) levels of a topic, split once for each topic.
+
+    note: the topics in the trees are relative to a component (eg. '$datatype',
+    '$stats/uptime') so they are few and shared by all the devices"""
+    return tuple(map(sys.intern, topic.strip("/").split("/")))
+
+
+class _TopicFilterNode(object):
+    __slots__ = ("children", "items")
+
+    def __init__(self):
+        self.children: dict[str, _TopicFilterNode] = dict()
+        self.items: dict = dict()
+
+
+class TopicFilterIndex(object):
+    """Items indexed by MQTT-style topic filters (eg. '$state', '$stats/#', '+/$name').
+
+    Filters are stored in a trie keyed on the topic levels, so the matching cost
+    depends on the topic length and not on the number of filters. Items are
+    identified by a key (ie. added and removed in O(1) on their filter).
+
+    note: unlike MQTT, the wildcards match also the levels starting with '$'
+    and an empty filter match the empty topic (ie. the value of the root)"""
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self):
+        self._root = _TopicFilterNode()
+        self._len = 0
+
+    @staticmethod
+    def _split(topic: str) -> list[str]:
+        return topic.split("/") if topic else []
+
+    def add(self, topic_filter: str, key: Any, item: Any):
+        filter_node = self._root
+
+        for topic_lvl in self._split(topic_filter):
+            filter_node = filter_node.children.setdefault(
+                sys.intern(topic_lvl), _TopicFilterNode()
+            )
+
+        if key not in filter_node.items:
+            self._len += 1
+
+        filter_node.items[key] = item
+
+    def remove(self, topic_filter: str, key: Any) -> bool:
+        filter_node = self._root
+
+        for topic_lvl in self._split(topic_filter):
+            if (filter_node := filter_node.children.get(topic_lvl)) is None:
+                return False
+
+        if filter_node.items.pop(key, None) is None:
+            return False
+
+        self._len -= 1
+        return True
+
+    def match(self, topic: str) -> list:
+        """Return the items (once) with a filter matching the topic."""
+        topic_lvls = topic_path(topic) if topic else ()
+        # Same item on overlapping filters (eg. "+" and "$fw/#" match "$fw")
+        items = dict()
+        stack = [(self._root, 0)]
+
+        while stack:
+            filter_node, depth = stack.pop()
+            children = filter_node.children
+
+            # "#" match also the parent level (ie. "a/#" match "a")
+            if (multi_lvl := children.get("#")) is not None:
+                items.update(multi_lvl.items)
+
+            if depth == len(topic_lvls):
+                items.update(filter_node.items)
+                continue
+
+            if (single_lvl := children.get("+")) is not None:
+                stack.append((single_lvl, depth + 1))
+
+            if (exact_lvl := children.get(topic_lvls[depth])) is not None:
+                stack.append((exact_lvl, depth + 1))
+
+        return list(items.values())
+
+    def __len__(self):
+        return self._len
 
 
 class Observable(object):
+    # note: no slots here, they are declared by the subclasses (ie. TopicDict)
+    __slots__ = ()
+
     def __init__(self):
-        self._callbacks = []
+        # Allocated on first subscribe
+        self._callbacks: dict | None = None
+        self._callbacks_index: TopicFilterIndex | None = None
+
+    @staticmethod
+    def _callback_key(callback: Callable) -> Any:
+        """Return the callback identity (ie. the same for each bound method access),
+        without a strong reference to the bound instance."""
+        if isinstance(callback, MethodType):
+            return id(callback.__self__), callback.__func__
+
+        return callback
+
+    def subscribe(
+        self, callback: Callable, topic_filter: str | None = None, weak: bool = False
+    ):
+        """Add a callback, called only for the topics matching topic_filter (if any).
+
+        With weak the callback (a bound method, eg. of an HA entity) doesn't keep
+        alive its instance and it's removed when the instance is garbage collected.
+
+        note: coroutine functions are scheduled as task, others are called inline
+        (ie. must be event loop safe, as HA @callback)"""
+        key = self._callback_key(callback)
+        is_coroutine = asyncio.iscoroutinefunction(callback)
+
+        if weak and isinstance(callback, MethodType):
+            callback = weakref.WeakMethod(
+                callback, functools.partial(self._prune, key, topic_filter)
+            )
+        else:
+            weak = False
 
-    def subscribe(self, callback: Callable):
-        self._callbacks.append(callback)
+        # Classified once: coroutine function (or event loop safe) and weak
+        callback_entry = (callback, is_coroutine, weak)
 
-    def unsubscribe(self, callback: Callable):
-        if callback in self._callbacks:
-            self._callbacks.remove(callback)
+        if topic_filter is not None:
+            if self._callbacks_index is None:
+                self._callbacks_index = TopicFilterIndex()
 
-    def _call_subscribers(self, *attrs, **kwargs):
-        fn_return = []
+            self._callbacks_index.add(topic_filter, key, callback_entry)
+            return
 
-        for fn in self._callbacks:
-            if asyncio.iscoroutinefunction(fn):
-                fn_return.append(asyncio.create_task(fn(*attrs, **kwargs)))
+        if self._callbacks is None:
+            self._callbacks = dict()
+
+        self._callbacks[key] = callback_entry
+
+    def unsubscribe(self, callback: Callable, topic_filter: str | None = None):
+        key = self._callback_key(callback)
+
+        if topic_filter is not None:
+            if self._callbacks_index is not None:
+                self._callbacks_index.remove(topic_filter, key)
+
+        elif self._callbacks:
+            self._callbacks.pop(key, None)
+
+    def _prune(self, key: Any, topic_filter: str | None, _ref=None):
+        """Remove a weak callback of a garbage collected instance."""
+        if topic_filter is not None:
+            if self._callbacks_index is not None:
+                self._callbacks_index.remove(topic_filter, key)
+
+        elif self._callbacks:
+            self._callbacks.pop(key, None)
+
+    def unsubscribe_all(self) -> int:
+        """Remove all the callbacks (eg. on teardown), return how many."""
+        count = len(self._callbacks or ()) + len(self._callbacks_index or ())
+        self._callbacks = self._callbacks_index = None
+
+        return count
+
+    def _call_subscribers(self, topic: str, *attrs, **kwargs):
+        """Call the subscribers interested in topic with attrs."""
+        # Copy: the callbacks can (un)subscribe
+        callbacks = list(self._callbacks.values()) if self._callbacks else []
+
+        if self._callbacks_index:
+            callbacks += self._callbacks_index.match(topic)
+
+        for fn, is_coroutine, weak in callbacks:
+            # Instance garbage collected (not pruned yet)
+            if weak and (fn := fn()) is None:
+                continue
+
+            if is_coroutine:
+                asyncio.create_task(fn(*attrs, **kwargs))
             else:
-                fn_return.append(fn(*attrs, **kwargs))
+                fn(*attrs, **kwargs)
 
 
 TopicDictCallbackType = Callable[[str, Any], bool]
 
 
-class TopicNode(dict):
-    def __init__(self, value: Any = None, sub_topic: dict[str, TopicNode] = {}):
-        super().__init__(sub_topic)
+class TopicFilter(object):
+    """Regex patterns compiled in a single matcher.
+
+    The literal prefixes (eg. '^\\$') are checked by str.startswith() and the others
+    are joined in one alternation regex."""
+
+    def __init__(self, *regex_patterns: str):
+        self._patterns = list()
+        self._prefixes = tuple()
+        self._regexes = list()
+        self.add(*regex_patterns)
+
+    @staticmethod
+    def _literal_prefix(regex_pattern: str) -> Union[str, None]:
+        if not regex_pattern.startswith("^"):
+            return None
+
+        prefix = re.sub(r"\\(\W)", r"\1", regex_pattern[1:])
+        return prefix if re.escape(prefix) == regex_pattern[1:] else None
+
+    def add(self, *regex_patterns: str):
+        self._patterns.extend(regex_patterns)
+
+        prefixes, others = list(), list()
+
+        for regex_pattern in self._patterns:
+            if (prefix := self._literal_prefix(regex_pattern)) is not None:
+                prefixes.append(prefix)
+            else:
+                others.append(regex_pattern)
+
+        self._prefixes = tuple(prefixes)
+
+        try:
+            self._regexes = (
+                [re.compile("|".join(f"(?:{pattern})" for pattern in others))]
+                if others
+                else []
+            )
+        except re.error:
+            # eg. inline global flags can't be joined
+            self._regexes = [re.compile(pattern) for pattern in others]
+
+    def search(self, topic_path: str) -> bool:
+        return topic_path.startswith(self._prefixes) or any(
+            regex.search(topic_path) for regex in self._regexes
+        )
+
+    def __bool__(self):
+        return bool(self._patterns)
+
+
+def _match_pattern(pattern_lvls: tuple[str, ...], topic_lvls: tuple[str, ...]) -> bool:
+    """Check the topic levels against a query pattern (see TopicNode.query())."""
+    for index, pattern_lvl in enumerate(pattern_lvls):
+        if pattern_lvl == "#":
+            return not any(
+                topic_lvl.startswith("$") for topic_lvl in topic_lvls[index:]
+            )
+
+        if index >= len(topic_lvls):
+            return False
+
+        if pattern_lvl == "+":
+            if topic_lvls[index].startswith("$"):
+                return False
+
+        elif pattern_lvl != topic_lvls[index]:
+            return False
+
+    return len(pattern_lvls) == len(topic_lvls)
+
+
+def _match_where(topic_node: TopicNode, where: dict[str, Any] | None) -> bool:
+    """Check the attributes (ie. sub-topics) of topic_node against the predicates:
+    a value (equal), a tuple/list/set (one of) or a callable (on the value)."""
+    if not where:
+        return True
+
+    for attr, expected in where.items():
+        value = topic_node.get(attr)
+
+        if callable(expected):
+            if not expected(value):
+                return False
+
+        elif isinstance(expected, (tuple, list, set, frozenset)):
+            if value not in expected:
+                return False
+
+        elif value != expected:
+            return False
+
+    return True
+
+
+class TopicIndex(object):
+    """Secondary indexes of a topic tree: the sub-trees (ie. nested TopicDict, eg.
+    the properties of a device) by the value of some attributes (eg. '$datatype').
+
+    Maintained by the TopicDict on set/delete (see TopicDict.add_index())."""
+
+    __slots__ = ("attrs", "_entries")
+
+    def __init__(self, *attrs: str):
+        self.attrs = frozenset(attrs)
+        # (attr, value) => {sub-tree path: sub-tree}
+        self._entries: dict[tuple[str, Any], dict[tuple[str, ...], TopicDict]] = dict()
+
+    def update(
+        self,
+        path: tuple[str, ...],
+        topic_dict: TopicDict,
+        attr: str,
+        old: Any,
+        new: Any,
+    ):
+        if old is not None and (entries := self._entries.get((attr, old))):
+            entries.pop(path, None)
+
+            if not entries:
+                del self._entries[(attr, old)]
+
+        if new is not None:
+            self._entries.setdefault((attr, new), dict())[path] = topic_dict
+
+    def lookup(
+        self, attr: str, values: tuple
+    ) -> Iterator[tuple[tuple[str, ...], TopicDict]]:
+        """Yield the (path, sub-tree) with attr equal to one of values."""
+        for value in values:
+            yield from self._entries.get((attr, value), {}).items()
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+
+class TopicNode(object):
+    """A topic level: the value and the (lazily allocated) sub-levels."""
+
+    __slots__ = ("_value", "_children")
+
+    def __init__(self, value: Any = None, sub_topic: dict[str, TopicNode] = None):
         self._value = value
+        self._children: dict[str, TopicNode] | None = (
+            {sys.intern(key): node for key, node in sub_topic.items()}
+            if sub_topic
+            else None
+        )
+
+    _topic_to_lst = staticmethod(topic_path)
 
     def __str__(self):
         topic_child_str = ", ".join(
-            "%s: %s" % (key, self.get(key, return_value=False).__str__())
-            for key in super().keys()
+            "%s: %s" % (key, node.__str__()) for key, node in self.items()
         )
         return "(%s, {%s})" % (self._value, topic_child_str)
 
     def __repr__(self):
         return self.__str__()
 
+    def __contains__(self, topic_lvl: str):
+        return self._children is not None and topic_lvl in self._children
+
+    def __iter__(self):
+        return iter(self._children or ())
+
+    def __len__(self):
+        return len(self._children) if self._children else 0
+
+    def keys(self):
+        return (self._children or {}).keys()
+
+    def values(self):
+        return (self._children or {}).values()
+
+    def items(self):
+        return (self._children or {}).items()
+
+    def child(self, topic_lvl: str, default: Any = None) -> Union[TopicNode, Any]:
+        """Return the direct sub-level."""
+        if self._children is None:
+            return default
+
+        return self._children.get(topic_lvl, default)
+
+    def _set_child(self, topic_lvl: str, topic_node: TopicNode) -> TopicNode:
+        if self._children is None:
+            self._children = dict()
+
+        self._children[sys.intern(topic_lvl)] = topic_node
+        return topic_node
+
+    def _pop_child(self, topic_lvl: str, default: Any = None):
+        if self._children is None:
+            return default
+
+        return self._children.pop(topic_lvl, default)
+
     def dict_value(self):
         return {k: v.value for k, v in self.items()}
 
+    def get(
+        self,
+        topic_path: Union[str, tuple, list],
+        default: Any = None,
+        return_value: bool = True,
+    ) -> Union[Any, TopicNode]:
+
+        if isinstance(topic_path, str):
+            # First level (eg. '$state', '$datatype') is a direct child
+            if (topic_node := self.child(topic_path)) is not None:
+                return topic_node._value if return_value else topic_node
+
+            topic_path = self._topic_to_lst(topic_path)
+
+        topic_node = self
+
+        for topic_lvl in topic_path:
+
+            if (topic_node := topic_node.child(topic_lvl)) is None:
+                return default
+
+        return topic_node.value if return_value else topic_node
+
+    def query(
+        self, pattern: str, where: dict[str, Any] | None = None
+    ) -> Iterator[tuple[str, TopicNode]]:
+        """Yield the (topic, TopicNode) matching an MQTT-style pattern (eg. '+/+',
+        '+/+/$unit', 'node-id/#') and, if any, the where attributes predicates
+        (eg. {'$datatype': 'float'}, see _match_where()).
+
+        note: unlike MQTT, the wildcards don't match the attributes (ie. the levels
+        starting with '$'), so '+/+' on a device are only its properties"""
+        pattern_lvls = topic_path(pattern) if pattern else ()
+        stack = [((), self, 0)]
+
+        while stack:
+            topic_lvls, topic_node, depth = stack.pop()
+
+            if depth == len(pattern_lvls):
+                if _match_where(topic_node, where):
+                    yield "/".join(topic_lvls), topic_node
+                continue
+
+            pattern_lvl = pattern_lvls[depth]
+
+            if pattern_lvl == "#":
+                if _match_where(topic_node, where):
+                    yield "/".join(topic_lvls), topic_node
+
+                # Still on '#' for the sub-levels
+                next_depth = depth
+
+            elif pattern_lvl == "+":
+                next_depth = depth + 1
+
+            else:
+                if (child := topic_node.child(pattern_lvl)) is not None:
+                    stack.append(((*topic_lvls, pattern_lvl), child, depth + 1))
+                continue
+
+            # Reversed: yielded in the tree order
+            stack.extend(
+                ((*topic_lvls, topic_lvl), child, next_depth)
+                for topic_lvl, child in reversed(topic_node.items())
+                if not topic_lvl.startswith("$")
+            )
+
+    def dump(self, exclude_topics: Container[str] = ()) -> Iterator[tuple[str, Any]]:
+        """Yield the (topic, value) of the whole tree (nested TopicDict included),
+        parents first and skipping the levels without value: the tree is rebuilt
+        by TopicDict.load() (see dump_jsonl() for a compact file format).
+
+        The levels in exclude_topics (eg. '$stats') are skipped with their sub-levels."""
+        if self._value is not None:
+            yield "", self._value
+
+        stack = [
+            (topic_lvl, child)
+            for topic_lvl, child in reversed(self.items())
+            if topic_lvl not in exclude_topics
+        ]
+
+        while stack:
+            topic, topic_node = stack.pop()
+
+            if topic_node._value is not None:
+                yield topic, topic_node._value
+
+            stack.extend(
+                (f"{topic}/{topic_lvl}", child)
+                for topic_lvl, child in reversed(topic_node.items())
+                if topic_lvl not in exclude_topics
+            )
+
+    def get_obj(self, topic_path: Union[str, tuple, list], default: TopicNode = None):
+        if default is None:
+            default = TopicNode()
+
+        return self.get(topic_path, default, return_value=False)
+
+    def __getitem__(self, topic_path) -> Any:
+        return self.get(topic_path)
+
     @property
     def value(self):
         return self._value
@@ -56,20 +524,39 @@ class TopicNode(dict):
         self._value = value
 
 
-# TODO: swap super(TopicNode, self) with TopicNode.method(self, )
 class TopicDict(TopicNode, Observable):
+    """Root of a topic tree: filter the topics to set and notify the changes.
+
+    note: the sub-levels are simple TopicNode (or a TopicDict when explicitly set)"""
+
+    __slots__ = (
+        "_callbacks",
+        "_callbacks_index",
+        "_include_topics",
+        "_exclude_topics",
+        "_filtered_topics",
+        "suppressed_updates",
+        "filtered_updates",
+        "_index",
+    )
+
     def __init__(self, include_topics: list[str] = [], exclude_topics: list[str] = []):
         TopicNode.__init__(self)
         Observable.__init__(self)
-        self._include_topics = list()
-        self._exclude_topics = list()
+        # Allocated on first pattern added
+        self._include_topics: TopicFilter | None = None
+        self._exclude_topics: TopicFilter | None = None
+        # Cache of the include/exclude decision by topic
+        self._filtered_topics: dict[str, bool] | None = None
+        # Updates not notified because the value is unchanged
+        self.suppressed_updates = 0
+        # Updates discarded by the include/exclude topics
+        self.filtered_updates = 0
+        # (index, path of this tree in the indexed one), see add_index()
+        self._index: tuple[TopicIndex, tuple[str, ...]] | None = None
         self.add_include_topic(*include_topics)
         self.add_exclude_topic(*exclude_topics)
 
-    @staticmethod
-    def _topic_to_lst(topic_path: str) -> list:
-        return topic_path.strip("/").split("/")
-
     @staticmethod
     def topic_get_head(topic: str) -> Union[tuple[str, str], bool]:
         topic = topic.strip("/")
@@ -81,84 +568,263 @@ class TopicDict(TopicNode, Observable):
         return topic[last_slash_index + 1 :], topic
 
     def add_include_topic(self, *regex_patterns: list[str]):
-        for regex_pattern in regex_patterns:
-            self._include_topics.append(re.compile(regex_pattern))
+        if not regex_patterns:
+            return
+
+        if self._include_topics is None:
+            self._include_topics = TopicFilter()
+
+        self._include_topics.add(*regex_patterns)
+        self._filtered_topics = dict()
 
     def add_exclude_topic(self, *regex_patterns: list[str]):
-        for regex_pattern in regex_patterns:
-            self._exclude_topics.append(re.compile(regex_pattern))
+        if not regex_patterns:
+            return
 
-    def _get_parent_by_topic(self, topic_path: str):
+        if self._exclude_topics is None:
+            self._exclude_topics = TopicFilter()
 
-        topic_path_list = self._topic_to_lst(topic_path)
-        return self.get(topic_path_list[:-1], return_value=False), topic_path_list[-1]
+        self._exclude_topics.add(*regex_patterns)
+        self._filtered_topics = dict()
 
-    def get(
-        self,
-        topic_path: Union[str, list],
-        default: Any = None,
-        return_value: bool = True,
-    ) -> Union[Any, TopicDict]:
+    def is_filtered(self, topic_path: str) -> bool:
+        """Return True if the topic is not included or is excluded."""
+        if self._filtered_topics is None:
+            return False
 
-        if not isinstance(topic_path, list):
-            topic_path = self._topic_to_lst(topic_path)
+        try:
+            return self._filtered_topics[topic_path]
+        except KeyError:
+            pass
 
-        topic_node = self
+        filtered = bool(
+            self._include_topics and not self._include_topics.search(topic_path)
+        ) or bool(self._exclude_topics and self._exclude_topics.search(topic_path))
 
-        for topic_lvl in topic_path:
+        if len(self._filtered_topics) >= FILTERED_TOPICS_CACHE_SIZE:
+            self._filtered_topics.clear()
 
-            if topic_lvl not in topic_node:
-                return default
+        self._filtered_topics[topic_path] = filtered
+        return filtered
 
-            topic_node = super(TopicDict, topic_node).__getitem__(topic_lvl)
+    def add_index(self, *attrs: str):
+        """Index the nested TopicDict (at any depth, eg. the properties) by the value
+        of the attrs (eg. '$datatype'), see query().
 
-        return topic_node.value if return_value else topic_node
+        note: the index is shared with (and updated by) the nested TopicDict"""
+        self._attach(TopicIndex(*attrs), ())
 
-    def get_obj(
-        self, topic_path: Union[str, list], default: TopicNode = TopicNode(None)
-    ):
-        return self.get(topic_path, default, return_value=False)
+    def _attach(self, index: TopicIndex, path: tuple[str, ...]):
+        self._index = (index, path)
 
-    def set(self, topic_path: str, value: Any, force: bool = False):
+        for attr in index.attrs:
+            if (value := self.get(attr)) is not None:
+                index.update(path, self, attr, None, value)
 
-        if not force:
-            if self._include_topics and not any(
-                regex_include.search(topic_path)
-                for regex_include in self._include_topics
-            ):
-                return False
+        for topic_lvls, topic_dict in self._nested():
+            topic_dict._attach(index, path + topic_lvls)
 
-            if self._exclude_topics and any(
-                regex_exclude.search(topic_path)
-                for regex_exclude in self._exclude_topics
-            ):
-                return False
+    def _detach(self):
+        if self._index is None:
+            return
+
+        index, path = self._index
+        self._index = None
+
+        for attr in index.attrs:
+            if (value := self.get(attr)) is not None:
+                index.update(path, self, attr, value, None)
+
+        for _, topic_dict in self._nested():
+            topic_dict._detach()
+
+    def _update_index(self, topic_levels: Union[tuple, list], old: Any, new: Any):
+        """Update the index of the attribute at topic_levels (owned by the nearest
+        TopicDict, eg. 'node-id/property-id/$datatype' of a device)."""
+        owner, attr_depth, topic_node = self, 0, self
+
+        for depth, topic_lvl in enumerate(topic_levels[:-1], 1):
+            if (topic_node := topic_node.child(topic_lvl)) is None:
+                break
+
+            if isinstance(topic_node, TopicDict):
+                owner, attr_depth = topic_node, depth
+
+        index, path = owner._index
+        attr = "/".join(topic_levels[attr_depth:])
+
+        if attr in index.attrs:
+            index.update(path, owner, attr, old, new)
 
+    def _nested(self) -> Iterator[tuple[tuple[str, ...], TopicDict]]:
+        """Yield the (relative levels, TopicDict) of the first nested TopicDict."""
+        stack = [((topic_lvl,), child) for topic_lvl, child in self.items()]
+
+        while stack:
+            topic_lvls, topic_node = stack.pop()
+
+            if isinstance(topic_node, TopicDict):
+                yield topic_lvls, topic_node
+                continue
+
+            stack.extend(
+                ((*topic_lvls, topic_lvl), child)
+                for topic_lvl, child in topic_node.items()
+            )
+
+    def query(
+        self, pattern: str, where: dict[str, Any] | None = None
+    ) -> Iterator[tuple[str, TopicNode]]:
+        """See TopicNode.query(), with an equality (or one of) predicate on an
+        indexed attribute only the matching sub-trees are checked (ie. O(matches))."""
+        if where and self._index is not None:
+            index, path = self._index
+
+            for attr, expected in where.items():
+                if attr not in index.attrs or expected is None or callable(expected):
+                    continue
+
+                if not isinstance(expected, (tuple, list, set, frozenset)):
+                    expected = (expected,)
+
+                pattern_lvls = topic_path(pattern) if pattern else ()
+
+                for sub_path, topic_dict in index.lookup(attr, tuple(expected)):
+                    # Only the sub-trees of this one (eg. the properties of a node)
+                    if sub_path[: len(path)] != path:
+                        continue
+
+                    topic_lvls = sub_path[len(path) :]
+
+                    if _match_pattern(pattern_lvls, topic_lvls) and _match_where(
+                        topic_dict, where
+                    ):
+                        yield "/".join(topic_lvls), topic_dict
+
+                return
+
+        yield from TopicNode.query(self, pattern, where)
+
+    def _get_parent_by_topic(self, topic_path: Union[str, tuple]):
+
+        if isinstance(topic_path, str):
+            topic_path = self._topic_to_lst(topic_path)
+
+        return self.get(topic_path[:-1], return_value=False), topic_path[-1]
+
+    def set(self, topic_path: Union[str, tuple], value: Any, force: bool = False):
+        """Set the value of a topic (string or pre-split levels, see topic_path())."""
+
+        if isinstance(topic_path, str):
+            topic_levels = self._topic_to_lst(topic_path)
+        else:
+            topic_levels, topic_path = topic_path, "/".join(topic_path)
+
+        if not force and self.is_filtered(topic_path):
+            self.filtered_updates += 1
+            return False
+
+        *topic_path_parent, topic_label = topic_levels
         topic_node = self
 
-        for topic_lvl in self._topic_to_lst(topic_path):
-            topic_node = topic_node.setdefault(topic_lvl, TopicDict())
+        for topic_lvl in topic_path_parent:
+            if (topic_child := topic_node.child(topic_lvl)) is None:
+                topic_child = topic_node._set_child(topic_lvl, TopicNode())
+
+            topic_node = topic_child
+
+        old_value = None
 
         if isinstance(value, TopicDict):
-            topic_parent_node, topic_label = self._get_parent_by_topic(topic_path)
-            super(TopicDict, topic_parent_node).__setitem__(topic_label, value)
+            replaced = topic_node.child(topic_label)
+
+            # A bulk loaded sub-tree (see load()) is adopted by the empty TopicDict
+            if type(replaced) is TopicNode and not value:
+                value._children, replaced._children = replaced._children, None
+
+                if value._value is None:
+                    value._value = replaced._value
+
+            topic_node._set_child(topic_label, value)
+
+            if self._index is not None:
+                if isinstance(replaced, TopicDict) and replaced is not value:
+                    replaced._detach()
+
+                value._attach(self._index[0], self._index[1] + tuple(topic_levels))
+
+        elif (topic_child := topic_node.child(topic_label)) is None:
+            topic_node._set_child(topic_label, TopicNode(value))
+
+        # Same value (eg. periodic or retained re-publish) => nothing to notify
+        elif not force and topic_child._value == value:
+            self.suppressed_updates += 1
+            return False
 
         else:
-            topic_node._value = value
+            old_value, topic_child._value = topic_child._value, value
 
-        Observable._call_subscribers(self, topic_path, value)
+        if self._index is not None and not isinstance(value, TopicDict):
+            self._update_index(topic_levels, old_value, value)
 
-    def _del(self, topic_path: str):
+        Observable._call_subscribers(self, topic_path, topic_path, value)
+
+    def _del(self, topic_path: Union[str, tuple]):
 
         topic_parent_node, topic_label = self._get_parent_by_topic(topic_path)
 
-        if not topic_parent_node:
+        if topic_parent_node is None:
             return False
 
-        return topic_parent_node.pop(topic_label, False)
+        topic_node = topic_parent_node._pop_child(topic_label, False)
 
-    def __getitem__(self, topic_path) -> Any:
-        return self.get(topic_path)
+        if self._index is None or topic_node is False:
+            return topic_node
+
+        if isinstance(topic_node, TopicDict):
+            topic_node._detach()
+            return topic_node
+
+        if isinstance(topic_path, str):
+            topic_path = self._topic_to_lst(topic_path)
+
+        self._update_index(topic_path, topic_node.value, None)
+
+        # Nested TopicDict in the removed sub-levels
+        for _, topic_dict in TopicDict._nested(topic_node):
+            topic_dict._detach()
+
+        return topic_node
+
+    def load(self, records: Iterable[tuple[str, Any]]) -> int:
+        """Bulk load the (topic, value) records (see dump()), return their number.
+
+        note: unlike set(), the include/exclude topics are not checked and the
+        subscribers are not notified (ie. a tree restore, not an update)"""
+        loaded = 0
+
+        for topic, value in records:
+            loaded += 1
+
+            if not topic:
+                self._value = value
+                continue
+
+            topic_levels = self._topic_to_lst(topic)
+            topic_node = self
+
+            for topic_lvl in topic_levels:
+                if (topic_child := topic_node.child(topic_lvl)) is None:
+                    topic_child = topic_node._set_child(topic_lvl, TopicNode())
+
+                topic_node = topic_child
+
+            old_value, topic_node._value = topic_node._value, value
+
+            if self._index is not None:
+                self._update_index(topic_levels, old_value, value)
+
+        return loaded
 
     def __setitem__(self, topic_path, value):
         self.set(topic_path, value)
@@ -172,6 +838,34 @@ class TopicDict(TopicNode, Observable):
 
     @value.setter
     def value(self, value):
+        if self._value == value:
+            self.suppressed_updates += 1
+            return
+
         self._value = value
 
-        Observable._call_subscribers(self, "", value)
+        Observable._call_subscribers(self, "", "", value)
+
+
+def dump_jsonl(records: Iterable[Any], fp: TextIO) -> int:
+    """Write the (topic, value) records (see TopicNode.dump()) as JSON lines, one
+    compact '["topic","value"]' for each line. Return the lines written.
+
+    note: any JSON value is allowed (eg. a header with the tree base topic)"""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    written = 0
+
+    for record in records:
+        fp.write(encode(record))
+        fp.write("\n")
+        written += 1
+
+    return written
+
+
+def load_jsonl(fp: TextIO) -> Iterator[Any]:
+    """Yield the records of a JSON lines file (see dump_jsonl()), one line at a
+    time (ie. streamed into TopicDict.load() without reading the whole file)."""
+    for line in fp:
+        if line := line.strip():
+            yield json.loads(line)
@@ -7,3 +7,17 @@ def str2bool(val: str):
 
 def bool2str(val: bool):
     return TRUE if val else FALSE
+
+
+def topic_match(topic_filter: list[str], topic: list[str]) -> bool:
+    """Check a topic (as list of levels) against a MQTT-style filter (as list of levels).
+
+    note: a trailing "#" also match the parent level (ie. "a/#" match "a")"""
+    for index, filter_lvl in enumerate(topic_filter):
+        if filter_lvl == "#":
+            return True
+
+        if index >= len(topic) or (filter_lvl != "+" and filter_lvl != topic[index]):
+            return False
+
+    return len(topic_filter) == len(topic)
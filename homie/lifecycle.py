@@ -0,0 +1,113 @@
+"""Eviction of the stale Homie devices (ie. lost, disconnected or removed)."""
+from __future__ import annotations
+
+import time
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import event
+
+from .homie import HomieDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device states without a device on the other side
+STALE_STATES = ("lost", "disconnected")
+
+# Max seconds between the stale devices checks
+CHECK_INTERVAL = 300
+
+
+class HomieLifecycle(object):
+    """Evict the devices stale (ie. '$state' lost/disconnected/absent or '$homie'
+    removed) and idle (ie. no messages received) for more than ttl seconds.
+
+    Evicted devices are torn down (subscriptions, observers and topics tree) and
+    removed from the known devices, then async_on_evict is called (eg. to remove
+    them from the HA device registry)."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        devices: dict[str, HomieDevice],
+        ttl: float,
+        async_on_evict: Callable[[HomieDevice], Awaitable] | None = None,
+    ):
+        self._hass = hass
+        self._devices = devices
+        self.ttl = ttl
+        self._async_on_evict = async_on_evict
+
+        # device id => (messages count, monotonic time) of the last activity seen
+        self._stale: dict[str, tuple[int, float]] = dict()
+        self._async_cancel_check = None
+
+        # Stats
+        self.evicted = 0
+        self.reclaimed: dict[str, int] = dict()
+
+    @property
+    def stale(self) -> int:
+        """Return the number of stale devices (not evicted yet)."""
+        return len(self._stale)
+
+    @staticmethod
+    def is_stale(device: HomieDevice) -> bool:
+        return device.t["$state"] in (*STALE_STATES, None) or not device.t["$homie"]
+
+    @callback
+    def async_start(self):
+        self._async_cancel_check = event.async_track_time_interval(
+            self._hass,
+            self._async_check,
+            timedelta(seconds=min(self.ttl, CHECK_INTERVAL)),
+        )
+
+    @callback
+    def async_stop(self):
+        if self._async_cancel_check:
+            self._async_cancel_check()
+            self._async_cancel_check = None
+
+    async def _async_check(self, _now=None):
+        now = time.monotonic()
+
+        for device_id, device in list(self._devices.items()):
+            if not self.is_stale(device):
+                self._stale.pop(device_id, None)
+                continue
+
+            messages = device.metrics()["messages"]
+            last_activity = self._stale.get(device_id)
+
+            # Stale from now, or still sending something (eg. retained re-publish)
+            if last_activity is None or last_activity[0] != messages:
+                self._stale[device_id] = (messages, now)
+
+            elif now - last_activity[1] >= self.ttl:
+                await self.async_evict(device)
+
+    async def async_evict(self, device: HomieDevice) -> dict[str, int]:
+        """Tear down a device and forget it, return the reclaimed objects."""
+        self._devices.pop(device.id, None)
+        self._stale.pop(device.id, None)
+
+        reclaimed = await device.async_teardown()
+
+        self.evicted += 1
+        for key, count in reclaimed.items():
+            self.reclaimed[key] = self.reclaimed.get(key, 0) + count
+
+        _LOGGER.info(
+            "Device '%s' evicted (stale for more than %ss), reclaimed: %s",
+            device.id,
+            self.ttl,
+            reclaimed,
+        )
+
+        if self._async_on_evict:
+            await self._async_on_evict(device)
+
+        return reclaimed
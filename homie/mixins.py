@@ -1,4 +1,8 @@
+from __future__ import annotations
+
 import logging
+import voluptuous as vol
+from typing import Collection, Iterable
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
@@ -12,7 +16,8 @@ from homeassistant.helpers.dispatcher import (
 )
 from homeassistant.const import CONF_PLATFORM
 
-from .homie import HomieDevice
+from .homie import HomieDevice, HomieProperty, TRUE
+from .homie.datatype import BOOLEAN, NUMERIC_DATATYPES
 from .utils import logger
 
 from .const import (
@@ -22,6 +27,7 @@ from .const import (
     BINARY_SENSOR,
     SENSOR,
     NUMBER,
+    PLATFORMS,
     CONF_PROPERTY,
     CONF_DEVICE,
     CONF_NODE,
@@ -32,6 +38,24 @@ from .const import (
 _LOGGER = logging.getLogger(__name__)
 
 
+def _not_settable(settable: str | None) -> bool:
+    return settable != TRUE
+
+
+# Platform of the discovered properties by their attributes (see TopicDict.query())
+DISCOVERY_PLATFORMS = (
+    # Actuators
+    (SWITCH, {"$datatype": BOOLEAN, "$settable": TRUE}),
+    (NUMBER, {"$datatype": NUMERIC_DATATYPES, "$settable": TRUE}),
+    # Sensors
+    (BINARY_SENSOR, {"$datatype": BOOLEAN, "$settable": _not_settable}),
+    (
+        SENSOR,
+        {"$datatype": lambda datatype: datatype != BOOLEAN, "$settable": _not_settable},
+    ),
+)
+
+
 @logger()
 @callback
 def async_create_ha_device(
@@ -78,75 +102,84 @@ def async_discover_properties(
     hass: HomeAssistant,
     device: HomieDevice,
     er: EntityRegistry = None,
+    properties: Collection[HomieProperty] | None = None,
 ):
+    """Fire the discovery of the device properties (or only of the given ones,
+    eg. added after the first discovery)."""
 
     # if er is None:
     #     er = entity_registry.async_get(hass)
 
-    @logger()
-    def fire_homie_discovery_new(platform: str, unique_id: str, payload: ConfigType):
-        """Fire new platform discovered."""
-        # If entity is not already added
-        # if not er.async_get_entity_id(platform, DOMAIN, unique_id):
-        async_dispatcher_send(
-            hass, HOMIE_DISCOVERY_NEW.format(platform), discovery_payload
-        )
-
-    # TODO: implement await device.nodes()
-    for node in device.nodes.values():
+    @logger(strip=True)
+    def fire_homie_discovery_new(platform: str, payloads: list[ConfigType]):
+        """Fire new platform discovered (with all its device properties)."""
+        async_dispatcher_send(hass, HOMIE_DISCOVERY_NEW.format(platform), payloads)
+
+    # One entities batch for each platform
+    for platform_domain, where in DISCOVERY_PLATFORMS:
+        # TODO: check include/exclude on property.base_topic
+        payloads = [
+            {
+                CONF_PROPERTY: {
+                    CONF_DEVICE: device.id,
+                    CONF_NODE: property.node.id,
+                    CONF_NAME: property.id,
+                },
+                # ...or simply pass
+                # CONF_PROPERTY_TOPIC: property.base_topic
+            }
+            for property in device.query_properties(where)
+            if properties is None or property in properties
+        ]
 
-        _LOGGER.debug("For node: %s", node.id)
-
-        for property in node.properties.values():
-
-            # TODO: check include/exclude on property.base_topic
+        # If entity is not already added
+        # if not er.async_get_entity_id(platform_domain, DOMAIN, property.base_topic):
+        if payloads:
+            fire_homie_discovery_new(platform_domain, payloads)
 
-            _LOGGER.debug("Try to match property: %s", property.id)
 
-            platform_domain = None
+@logger()
+@callback
+def async_remove_properties_entities(
+    hass: HomeAssistant,
+    properties: Iterable[HomieProperty],
+    er: EntityRegistry = None,
+) -> int:
+    """Remove the (discovered) entities of the properties from HA and the entity
+    registry (eg. properties not announced anymore), return how many."""
+    if er is None:
+        er = entity_registry.async_get(hass)
 
-            if property.settable:
-                # Actuators
-                if property.datatype == "boolean":
-                    platform_domain = SWITCH
-                elif property.datatype in ["integer", "float", "percent"]:
-                    platform_domain = NUMBER
-            else:
-                # Sensors
-                if property.datatype == "boolean":
-                    platform_domain = BINARY_SENSOR
-                else:
-                    platform_domain = SENSOR
+    removed = 0
 
-            if platform_domain:
-                discovery_payload = {
-                    CONF_PROPERTY: {
-                        CONF_DEVICE: device.id,
-                        CONF_NODE: node.id,
-                        CONF_NAME: property.id,
-                    },
-                    # ...or simply pass
-                    # CONF_PROPERTY_TOPIC: property.base_topic
-                }
+    for property in properties:
+        for platform_domain in PLATFORMS:
+            if entity_id := er.async_get_entity_id(
+                platform_domain, DOMAIN, property.base_topic
+            ):
+                er.async_remove(entity_id)
+                removed += 1
 
-                fire_homie_discovery_new(
-                    platform_domain, property.base_topic, discovery_payload
-                )
+    return removed
 
 
 async def async_setup_entry_helper(hass, domain, async_setup, schema):
     """Setup entity creation dynamically through discovery."""
 
-    async def async_discover(discovery_payload):
-        """Discover and add an Homie property as HA entity."""
+    async def async_discover(discovery_payloads: list[ConfigType]):
+        """Discover and add Homie properties as HA entities (in one batch)."""
+        configs = list()
+
+        for discovery_payload in discovery_payloads:
+            # Add the schama mandatory key
+            discovery_payload[CONF_PLATFORM] = DOMAIN
 
-        # Add the schama mandatory key
-        discovery_payload[CONF_PLATFORM] = DOMAIN
+            try:
+                configs.append(schema(discovery_payload))
+            except vol.Invalid as err:
+                _LOGGER.error("Invalid %s discovery payload: %s", domain, err)
 
-        try:
-            config = schema(discovery_payload)
-            await async_setup(config)
-        except Exception:
-            raise
+        if configs:
+            await async_setup(configs)
 
     async_dispatcher_connect(hass, HOMIE_DISCOVERY_NEW.format(domain), async_discover)
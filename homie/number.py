@@ -26,6 +26,8 @@ from .const import (
     HOMIE_DISCOVERY_NEW,
     HOMIE_DISCOVERY_NEW_DEVICE,
     NUMBER,
+    CONF_COMMAND_WINDOW,
+    CONF_COMMAND_TIMEOUT,
     CONF_DEVICE,
     CONF_PROPERTY,
 )
@@ -56,6 +58,10 @@ PLATFORM_SCHEMA = entity_base.SCHEMA_BASE.extend(
         vol.Optional(CONF_MAX): vol.Coerce(float),
         vol.Optional(CONF_MIN): vol.Coerce(float),
         vol.Optional(CONF_OPTIMISTIC, default=DEFAULT_OPTIMISTIC): cv.boolean,
+        vol.Optional(CONF_COMMAND_WINDOW): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_COMMAND_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
         vol.Optional(CONF_STEP): vol.All(vol.Coerce(float), vol.Range(min=1e-3)),
         vol.Optional(CONF_MODE, default=number.NumberMode.AUTO): vol.All(
             vol.Lower, vol.In(["auto", "slider", "box"])
@@ -77,10 +83,10 @@ async def async_setup_platform(
     """Called if exist a platform entry (ie. 'platform: homie') in configuration.yaml"""
     device_id = config[CONF_PROPERTY][CONF_DEVICE]
 
-    # Workaround to bind entity and device (calling directly "_async_setup_entity" don't work)
-    # setup = functools.partial(_async_setup_entity, hass, async_add_entities, config)
+    # Workaround to bind entity and device (calling directly "_async_setup_entities" don't work)
+    # setup = functools.partial(_async_setup_entities, hass, async_add_entities, [config])
     setup = functools.partial(
-        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(NUMBER), config
+        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(NUMBER), [config]
     )
 
     # Avoid to create a new Home Device but wait its discovered first
@@ -93,23 +99,31 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     Called by hass.config_entries.async_forward_entry_setup() in async_setup_entry() component."""
     setup = functools.partial(
-        _async_setup_entity, hass, async_add_entities, config_entry=config_entry
+        _async_setup_entities, hass, async_add_entities, config_entry=config_entry
     )
 
     # Listening on new domain platfrom (eg number) discovered and init the setup
     await async_setup_entry_helper(hass, NUMBER, setup, PLATFORM_SCHEMA)
 
 
-async def _async_setup_entity(hass, async_add_entities, config, config_entry=None):
-    """Setup the HA number with an HomieProperty."""
+async def _async_setup_entities(hass, async_add_entities, configs, config_entry=None):
+    """Setup the HA numbers (in one batch) with the HomieProperties."""
 
-    homie_property = await entity_base.async_get_homie_property(hass, config)
-    async_add_entities([HomieNumber(hass, homie_property, config, config_entry)])
+    homie_properties = await entity_base.async_get_homie_properties(hass, configs)
+    async_add_entities(
+        [
+            HomieNumber(hass, homie_property, config, config_entry)
+            for homie_property, config in homie_properties
+        ]
+    )
 
 
 class HomieNumber(entity_base.HomieEntity, number.NumberEntity):
     """Implementation of a Homie Number."""
 
+    # Actuators: shorter window
+    _state_write_window = 0.1
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -124,27 +138,61 @@ class HomieNumber(entity_base.HomieEntity, number.NumberEntity):
 
         self._optimistic = self._config.get(CONF_OPTIMISTIC)
 
+        # Passed to each set (ie. the property command is shared by its entities)
+        self._command_window = self._config.get(CONF_COMMAND_WINDOW)
+        self._command_timeout = self._config.get(CONF_COMMAND_TIMEOUT)
+
+    def _format_bound(self, index: int) -> float | None:
+        """Return a bound of the (parsed) format 'min:max[:step]', if any."""
+        if (bounds := self._homie_property.format) and len(bounds) > index:
+            return bounds[index]
+
+        return None
+
     @property
     def native_min_value(self) -> float:
         """Return the minimum value."""
-        min_value, _ = self._homie_property.t.get("$format").split(":")
-        return self._config.get(CONF_MIN, float(min_value))
+        if CONF_MIN in self._config:
+            return self._config[CONF_MIN]
+
+        if (min_value := self._format_bound(0)) is None:
+            return super().native_min_value
+
+        return min_value
 
     @property
     def native_max_value(self) -> float:
         """Return the maximum value."""
-        _, max_value = self._homie_property.t.get("$format").split(":")
-        return self._config.get(CONF_MAX, float(max_value))
+        if CONF_MAX in self._config:
+            return self._config[CONF_MAX]
+
+        if (max_value := self._format_bound(1)) is None:
+            return super().native_max_value
+
+        return max_value
 
     @property
     def native_step(self) -> float:
         """Return the increment/decrement step."""
-        return self._config.get(CONF_STEP, super().native_step)
+        if CONF_STEP in self._config:
+            return self._config[CONF_STEP]
+
+        if (step := self._format_bound(2)) is None:
+            return super().native_step
+
+        return step
 
     @property
     def native_value(self):
         """Return the current value."""
-        return self._homie_property.value
+        # Last command until echoed by the device (or rolled back on timeout)
+        if self._optimistic:
+            assumed = self._homie_property.assumed_value
+
+            if assumed is not None:
+                return assumed
+
+        return self._homie_property.typed_value
 
     @property
     def native_unit_of_measurement(self) -> str | None:
@@ -162,12 +210,9 @@ class HomieNumber(entity_base.HomieEntity, number.NumberEntity):
         # if value.is_integer():
         #     value = int(value)
 
-        await self._homie_property.async_set(value)
-
-        if self._optimistic:
-            # Optimistically set the new value.
-            self._homie_property.value = value
-            self.async_write_ha_state()
+        await self._homie_property.async_set(
+            value, self._command_window, self._command_timeout
+        )
 
     @property
     def assumed_state(self):
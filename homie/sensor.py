@@ -3,31 +3,40 @@ from __future__ import annotations
 import logging
 import functools
 import voluptuous as vol
+from dataclasses import dataclass
+from typing import Any, Callable
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.dispatcher import (
     async_dispatcher_connect,
     async_dispatcher_send,
 )
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from homeassistant.const import (
     CONF_UNIT_OF_MEASUREMENT,
+    DATA_BYTES,
+    TIME_MILLISECONDS,
+    TIME_SECONDS,
 )
 
 from homeassistant.components import sensor
 
 from . import entity_base
-from .homie import HomieProperty
+from .homie import HomieDevice, HomieProperty
+from .homie.datatype import NUMERIC_DATATYPES
 from .mixins import async_setup_entry_helper
 from .utils import logger
 
 from .const import (
+    DOMAIN,
     HOMIE_DISCOVERY_NEW,
     HOMIE_DISCOVERY_NEW_DEVICE,
+    HOMIE_DISCOVERY_NEW_DIAGNOSTICS,
     SENSOR,
     CONF_DEVICE_CLASS,
     CONF_DEVICE,
@@ -60,10 +69,10 @@ async def async_setup_platform(
     """Called if exist a platform entry (ie. 'platform: homie') in configuration.yaml"""
     device_id = config[CONF_PROPERTY][CONF_DEVICE]
 
-    # Workaround to bind entity and device (calling directly "_async_setup_entity" don't work)
-    # setup = functools.partial(_async_setup_entity, hass, async_add_entities, config)
+    # Workaround to bind entity and device (calling directly "_async_setup_entities" don't work)
+    # setup = functools.partial(_async_setup_entities, hass, async_add_entities, [config])
     setup = functools.partial(
-        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(SENSOR), config
+        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(SENSOR), [config]
     )
 
     # Avoid to create a new Home Device but wait its discovered first
@@ -76,18 +85,39 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     Called by hass.config_entries.async_forward_entry_setup() in async_setup_entry() component."""
     setup = functools.partial(
-        _async_setup_entity, hass, async_add_entities, config_entry=config_entry
+        _async_setup_entities, hass, async_add_entities, config_entry=config_entry
     )
 
     # Listening on new domain platfrom (eg sensor) discovered and init the setup
     await async_setup_entry_helper(hass, SENSOR, setup, PLATFORM_SCHEMA)
 
+    @callback
+    def async_add_diagnostics(homie_device: HomieDevice):
+        """Add the diagnostic sensors of a device (once, on its first ready)."""
+        async_add_entities(
+            [
+                HomieDiagnosticSensor(homie_device, description)
+                for description in DIAGNOSTIC_SENSORS
+            ]
+        )
 
-async def _async_setup_entity(hass, async_add_entities, config, config_entry=None):
-    """Setup the HA sensor with an HomieProperty."""
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, HOMIE_DISCOVERY_NEW_DIAGNOSTICS, async_add_diagnostics
+        )
+    )
 
-    homie_property = await entity_base.async_get_homie_property(hass, config)
-    async_add_entities([HomieSensor(hass, homie_property, config, config_entry)])
+
+async def _async_setup_entities(hass, async_add_entities, configs, config_entry=None):
+    """Setup the HA sensors (in one batch) with the HomieProperties."""
+
+    homie_properties = await entity_base.async_get_homie_properties(hass, configs)
+    async_add_entities(
+        [
+            HomieSensor(hass, homie_property, config, config_entry)
+            for homie_property, config in homie_properties
+        ]
+    )
 
 
 # TODO: remove RestoreEntity
@@ -121,9 +151,124 @@ class HomieSensor(entity_base.HomieEntity, sensor.SensorEntity, RestoreEntity):
     @property
     def native_value(self):
         """Return the state of the entity."""
+        # Numbers as is (ie. not converted again by HA, right statistics)
+        if self._homie_property.datatype in NUMERIC_DATATYPES:
+            return self._homie_property.typed_value
+
         return self._homie_property.value
 
     @property
     def state_class(self) -> str | None:
         """Return the state class of the sensor."""
         return self._config.get(sensor.CONF_STATE_CLASS)
+
+
+@dataclass
+class HomieDiagnosticSensorRequiredKeysMixin:
+    """Value from the device metrics (see HomieDevice.metrics())."""
+
+    value_fn: Callable[[dict], Any]
+
+
+@dataclass
+class HomieDiagnosticSensorDescription(
+    sensor.SensorEntityDescription, HomieDiagnosticSensorRequiredKeysMixin
+):
+    """Describe a Homie device diagnostic sensor."""
+
+
+def _avg_ms(histogram: dict) -> float | None:
+    return round(histogram["avg"] * 1000, 3) if histogram["avg"] is not None else None
+
+
+def _seconds(value: float | None) -> float | None:
+    return round(value, 3) if value is not None else None
+
+
+DIAGNOSTIC_SENSORS = (
+    HomieDiagnosticSensorDescription(
+        key="messages",
+        name="Messages",
+        icon="mdi:message-processing-outline",
+        state_class=sensor.SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics["messages"],
+    ),
+    HomieDiagnosticSensorDescription(
+        key="bytes",
+        name="Received bytes",
+        icon="mdi:download-network-outline",
+        native_unit_of_measurement=DATA_BYTES,
+        state_class=sensor.SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics["bytes"],
+    ),
+    HomieDiagnosticSensorDescription(
+        key="filtered",
+        name="Filtered messages",
+        icon="mdi:filter-outline",
+        state_class=sensor.SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics["filtered"],
+    ),
+    HomieDiagnosticSensorDescription(
+        key="suppressed",
+        name="Suppressed updates",
+        icon="mdi:equal",
+        state_class=sensor.SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics["suppressed"],
+    ),
+    HomieDiagnosticSensorDescription(
+        key="ingest_time",
+        name="Callback time",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        state_class=sensor.SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: _avg_ms(metrics["ingest_time"]),
+    ),
+    HomieDiagnosticSensorDescription(
+        key="ready_duration",
+        name="Time to ready",
+        icon="mdi:timer-sand-complete",
+        native_unit_of_measurement=TIME_SECONDS,
+        value_fn=lambda metrics: _seconds(metrics["ready_duration"]),
+    ),
+    HomieDiagnosticSensorDescription(
+        key="command_latency",
+        name="Command latency",
+        icon="mdi:swap-horizontal",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        state_class=sensor.SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: _avg_ms(metrics["command_latency"]),
+    ),
+)
+
+
+class HomieDiagnosticSensor(sensor.SensorEntity):
+    """Ingestion metric of a Homie Device (polled, not bound to a property)."""
+
+    entity_description: HomieDiagnosticSensorDescription
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        homie_device: HomieDevice,
+        description: HomieDiagnosticSensorDescription,
+    ):
+        """Initialize Homie diagnostic sensor."""
+        self.entity_description = description
+        self._homie_device = homie_device
+
+        self._attr_name = (
+            f"{homie_device.t.get('$name', homie_device.id)} {description.name}"
+        )
+        self._attr_unique_id = f"{homie_device.base_topic}/$metrics/{description.key}"
+        self._attr_device_info = {"identifiers": {(DOMAIN, homie_device.id)}}
+
+    @property
+    def native_value(self):
+        """Return the metric value."""
+        return self.entity_description.value_fn(self._homie_device.metrics())
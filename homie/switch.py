@@ -29,6 +29,8 @@ from .const import (
     HOMIE_DISCOVERY_NEW,
     HOMIE_DISCOVERY_NEW_DEVICE,
     SWITCH,
+    CONF_COMMAND_WINDOW,
+    CONF_COMMAND_TIMEOUT,
     CONF_DEVICE_CLASS,
     CONF_DEVICE,
     CONF_PROPERTY,
@@ -43,6 +45,10 @@ DEFAULT_OPTIMISTIC = False
 PLATFORM_SCHEMA = entity_base.SCHEMA_BASE.extend(
     {
         vol.Optional(CONF_OPTIMISTIC, default=DEFAULT_OPTIMISTIC): cv.boolean,
+        vol.Optional(CONF_COMMAND_WINDOW): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_COMMAND_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
         # CONF_DEVICE_CLASS present in all entities but differ possible values by platfrom types
         vol.Optional(CONF_DEVICE_CLASS): switch.DEVICE_CLASSES_SCHEMA,
         # TODO: add "external" state_topic (device-node-property)
@@ -63,10 +69,10 @@ async def async_setup_platform(
     """Called if exist a platform entry (ie. 'platform: homie') in configuration.yaml"""
     device_id = config[CONF_PROPERTY][CONF_DEVICE]
 
-    # Workaround to bind entity and device (calling directly "_async_setup_entity" don't work)
-    # setup = functools.partial(_async_setup_entity, hass, async_add_entities, config)
+    # Workaround to bind entity and device (calling directly "_async_setup_entities" don't work)
+    # setup = functools.partial(_async_setup_entities, hass, async_add_entities, [config])
     setup = functools.partial(
-        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(SWITCH), config
+        async_dispatcher_send, hass, HOMIE_DISCOVERY_NEW.format(SWITCH), [config]
     )
 
     # Avoid to create a new Home Device but wait its discovered first
@@ -79,23 +85,31 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     Called by hass.config_entries.async_forward_entry_setup() in async_setup_entry() component."""
     setup = functools.partial(
-        _async_setup_entity, hass, async_add_entities, config_entry=config_entry
+        _async_setup_entities, hass, async_add_entities, config_entry=config_entry
     )
 
     # Listening on new domain platfrom (eg switch) discovered and init the setup
     await async_setup_entry_helper(hass, SWITCH, setup, PLATFORM_SCHEMA)
 
 
-async def _async_setup_entity(hass, async_add_entities, config, config_entry=None):
-    """Setup the HA switch with an HomieProperty."""
+async def _async_setup_entities(hass, async_add_entities, configs, config_entry=None):
+    """Setup the HA switchs (in one batch) with the HomieProperties."""
 
-    homie_property = await entity_base.async_get_homie_property(hass, config)
-    async_add_entities([HomieSwitch(hass, homie_property, config, config_entry)])
+    homie_properties = await entity_base.async_get_homie_properties(hass, configs)
+    async_add_entities(
+        [
+            HomieSwitch(hass, homie_property, config, config_entry)
+            for homie_property, config in homie_properties
+        ]
+    )
 
 
 class HomieSwitch(entity_base.HomieEntity, switch.SwitchEntity, RestoreEntity):
     """Implementation of a Homie Switch."""
 
+    # Actuators: shorter window
+    _state_write_window = 0.1
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -110,6 +124,10 @@ class HomieSwitch(entity_base.HomieEntity, switch.SwitchEntity, RestoreEntity):
 
         self._optimistic = self._config.get(CONF_OPTIMISTIC)
 
+        # Passed to each set (ie. the property command is shared by its entities)
+        self._command_window = self._config.get(CONF_COMMAND_WINDOW)
+        self._command_timeout = self._config.get(CONF_COMMAND_TIMEOUT)
+
     async def async_added_to_hass(self):
         """Prefill with last state if optimistic."""
 
@@ -124,27 +142,31 @@ class HomieSwitch(entity_base.HomieEntity, switch.SwitchEntity, RestoreEntity):
     @property
     def is_on(self):
         """Returns true if the Homie Switch is on."""
-        return str2bool(self._homie_property.value)
+        value = self._homie_property.typed_value
+
+        # Last command until echoed by the device (or rolled back on timeout)
+        if self._optimistic:
+            assumed = self._homie_property.assumed_value
+
+            if assumed is not None:
+                value = assumed
+
+        # Decoded by the property on boolean datatype
+        return value if isinstance(value, bool) else str2bool(value)
 
     @logger()
     async def async_turn_on(self, **kwargs):
         """Turn the device on."""
-        await self._homie_property.async_set(TRUE)
-
-        if self._optimistic:
-            # Optimistically assume that switch has changed state.
-            self._homie_property.value = TRUE
-            self.async_write_ha_state()
+        await self._homie_property.async_set(
+            TRUE, self._command_window, self._command_timeout
+        )
 
     @logger()
     async def async_turn_off(self, **kwargs):
         """Turn the device off."""
-        await self._homie_property.async_set(FALSE)
-
-        if self._optimistic:
-            # Optimistically assume that switch has changed state.
-            self._homie_property.value = FALSE
-            self.async_write_ha_state()
+        await self._homie_property.async_set(
+            FALSE, self._command_window, self._command_timeout
+        )
 
     @property
     def assumed_state(self):
@@ -6,23 +6,39 @@ from functools import wraps
 _LOGGER = logging.getLogger(__name__)
 
 
-def logger(lvl="debug", prefix=""):
-    """Function decorator, print on fn name and args at each invocation."""
+def logger(lvl="debug", prefix="", strip=False):
+    """Function decorator, print on fn name and args at each invocation.
+
+    The args are bound and formatted only if the logger is enabled for lvl.
+    With strip the function is returned as is (ie. no wrapper cost at all) when the
+    logger is not enabled for lvl at decoration time (eg. nested fn of a setup)."""
+
+    # Wrong attr lvl, logger doesn't have level lvl
+    if not isinstance(level := logging.getLevelName(lvl.upper()), int):
+        return lambda f: f
 
     def wrap(f):
+        def get_logger():
+            return f.__globals__.get("_LOGGER", _LOGGER)
+
+        if strip and not get_logger().isEnabledFor(level):
+            return f
+
+        signature = inspect.signature(f)
+
         def log_fn(args, kwargs):
-            logger = f.__globals__.get("_LOGGER", _LOGGER)
+            logger = get_logger()
 
-            # Wrong attr lvl, logger doesn't have method lvl
-            if logger_method := getattr(logger, lvl, False):
+            if not logger.isEnabledFor(level):
+                return
 
-                # function args format as string
-                func_args = inspect.signature(f).bind(*args, **kwargs).arguments
-                func_args_str = ", ".join(
-                    map("{0[0]} = {0[1]!r}".format, func_args.items())
-                )
+            # function args format as string
+            func_args = signature.bind(*args, **kwargs).arguments
+            func_args_str = ", ".join(
+                map("{0[0]} = {0[1]!r}".format, func_args.items())
+            )
 
-                logger_method(f"{prefix}%s ( %s )", f.__name__, func_args_str)
+            logger.log(level, f"{prefix}%s ( %s )", f.__name__, func_args_str)
 
         # Manage normal anc coroutine function
         if asyncio.iscoroutinefunction(f):